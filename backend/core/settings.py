@@ -124,6 +124,26 @@ if db_from_env:
     DATABASES['default'].update(db_from_env)
 
 
+# Cache
+# Market events and prefetched AI cards are shared through the cache, so with
+# more than one worker process set REDIS_URL; the default local-memory cache
+# is per process and only fully correct with a single worker.
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
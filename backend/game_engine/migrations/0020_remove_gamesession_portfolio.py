@@ -0,0 +1,32 @@
+from django.db import migrations
+
+
+def copy_portfolio_to_items(apps, schema_editor):
+    GameSession = apps.get_model('game_engine', 'GameSession')
+    PortfolioItem = apps.get_model('game_engine', 'PortfolioItem')
+
+    # Until this migration trades only updated the portfolio JSON, so it is the
+    # current copy for every session; the rows 0019 created may be stale.
+    # Rebuild all holdings from it before the field is dropped.
+    PortfolioItem.objects.all().delete()
+    items = []
+    for session_id, portfolio in GameSession.objects.values_list('id', 'portfolio'):
+        for sector, units in (portfolio or {}).items():
+            if units > 0:
+                items.append(PortfolioItem(session_id=session_id, sector=sector, units=float(units)))
+    PortfolioItem.objects.bulk_create(items, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_engine', '0019_auto_20260216_0025'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_portfolio_to_items, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='gamesession',
+            name='portfolio',
+        ),
+    ]
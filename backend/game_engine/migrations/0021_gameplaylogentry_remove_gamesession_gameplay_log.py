@@ -0,0 +1,56 @@
+import re
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+_MONTH_PREFIX = re.compile(r'^Month (\d+):')
+
+
+def split_gameplay_log(apps, schema_editor):
+    GameSession = apps.get_model('game_engine', 'GameSession')
+    GameplayLogEntry = apps.get_model('game_engine', 'GameplayLogEntry')
+
+    entries = []
+    for session_id, month, log in GameSession.objects.exclude(gameplay_log='').values_list(
+        'id', 'current_month', 'gameplay_log'
+    ):
+        for line in log.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            match = _MONTH_PREFIX.match(line)
+            entries.append(GameplayLogEntry(
+                session_id=session_id,
+                month=int(match.group(1)) if match else month,
+                text=line,
+            ))
+    GameplayLogEntry.objects.bulk_create(entries)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_engine', '0020_remove_gamesession_portfolio'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameplayLogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.IntegerField()),
+                ('text', models.TextField()),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='log_entries', to='game_engine.gamesession')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['session', 'id'], name='game_engine_session_b8e094_idx')],
+            },
+        ),
+        migrations.RunPython(split_gameplay_log, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='gamesession',
+            name='gameplay_log',
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-16 07:43
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_engine', '0021_gameplaylogentry_remove_gamesession_gameplay_log'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='futurescontract',
+            index=models.Index(fields=['session', 'created_month'], name='game_engine_session_2def47_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gamehistory',
+            index=models.Index(fields=['user', '-played_at'], name='game_engine_user_id_a0888b_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_choice_count(apps, schema_editor):
+    GameSession = apps.get_model('game_engine', 'GameSession')
+    counts = GameSession.objects.annotate(n=Count('player_choices')).values_list('id', 'n')
+    for session_id, n in counts:
+        if n:
+            GameSession.objects.filter(id=session_id).update(choice_count=n)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_engine', '0022_history_and_futures_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamesession',
+            name='choice_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_choice_count, migrations.RunPython.noop),
+    ]
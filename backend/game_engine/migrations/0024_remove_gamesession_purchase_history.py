@@ -0,0 +1,49 @@
+from django.db import migrations
+
+
+def copy_purchase_history_to_ledger(apps, schema_editor):
+    GameSession = apps.get_model('game_engine', 'GameSession')
+    TransactionLedger = apps.get_model('game_engine', 'TransactionLedger')
+
+    # Until this migration buys were only appended to purchase_history, so the
+    # ledger holds just the BUY rows 0019 copied, possibly a stale prefix.
+    # Replace them with the full JSON history before the field is dropped.
+    sessions = GameSession.objects.values_list('id', 'purchase_history', 'current_month')
+    session_ids = []
+    rows = []
+    for session_id, history, current_month in sessions:
+        if not history:
+            continue
+        session_ids.append(session_id)
+        for record in history:
+            units = float(record.get('units', 0))
+            price = float(record.get('price', 0))
+            rows.append(TransactionLedger(
+                session_id=session_id,
+                transaction_type='BUY',
+                sector=record.get('sector', 'unknown'),
+                units=units,
+                price_per_unit=price,
+                total_amount=units * price,
+                month=record.get('month', current_month),
+            ))
+    for start in range(0, len(session_ids), 500):
+        TransactionLedger.objects.filter(
+            session_id__in=session_ids[start:start + 500], transaction_type='BUY'
+        ).delete()
+    TransactionLedger.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_engine', '0023_gamesession_choice_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_purchase_history_to_ledger, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='gamesession',
+            name='purchase_history',
+        ),
+    ]
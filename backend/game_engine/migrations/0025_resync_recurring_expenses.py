@@ -0,0 +1,24 @@
+from django.db import migrations
+from django.db.models import Q, Sum
+
+
+def resync_recurring_expenses(apps, schema_editor):
+    """The cached total used to lag until the next month; bring it up to date."""
+    GameSession = apps.get_model('game_engine', 'GameSession')
+    totals = GameSession.objects.annotate(
+        active_total=Sum('expenses__amount', filter=Q(expenses__is_cancelled=False))
+    ).values_list('id', 'active_total', 'recurring_expenses')
+    for session_id, active_total, cached in totals:
+        if (active_total or 0) != cached:
+            GameSession.objects.filter(id=session_id).update(recurring_expenses=active_total or 0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_engine', '0024_remove_gamesession_purchase_history'),
+    ]
+
+    operations = [
+        migrations.RunPython(resync_recurring_expenses, migrations.RunPython.noop),
+    ]
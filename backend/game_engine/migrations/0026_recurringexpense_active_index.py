@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-16 07:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_engine', '0025_resync_recurring_expenses'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recurringexpense',
+            index=models.Index(fields=['session', 'is_cancelled'], name='game_engine_session_b38d29_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-16 07:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_engine', '0026_recurringexpense_active_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='playerchoice',
+            index=models.Index(fields=['session', 'card'], name='game_engine_session_f9f41f_idx'),
+        ),
+    ]
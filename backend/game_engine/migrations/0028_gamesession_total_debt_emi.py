@@ -0,0 +1,28 @@
+from django.db import migrations, models
+from django.db.models import Q, Sum
+
+
+def backfill_total_debt_emi(apps, schema_editor):
+    GameSession = apps.get_model('game_engine', 'GameSession')
+    totals = GameSession.objects.annotate(
+        debt_total=Sum('expenses__amount', filter=Q(expenses__is_cancelled=False, expenses__category='DEBT'))
+    ).values_list('id', 'debt_total')
+    for session_id, debt_total in totals:
+        if debt_total:
+            GameSession.objects.filter(id=session_id).update(total_debt_emi=debt_total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_engine', '0027_playerchoice_session_card_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamesession',
+            name='total_debt_emi',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_total_debt_emi, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-16 08:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_engine', '0028_gamesession_total_debt_emi'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamehistory',
+            name='session',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='history', to='game_engine.gamesession'),
+        ),
+        migrations.AddField(
+            model_name='gamesession',
+            name='report_started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -77,8 +77,15 @@ class AIStockPredictor:
         
         # 1. Prepare Initial Context
         # We need the last 60 days of data to predict Day 1
-        current_context = seed_data.values[-60:] # Ensure we have exactly 60
+        current_context = np.asarray(seed_data.values[-60:], dtype=float) # Ensure we have exactly 60
         current_price = current_context[-1, 0] # Assume 'Close' is col 0
+        # The scaler is a per-column affine map (MinMax/Standard): x * gain + offset.
+        # Read it off once so the 20 * months steps below skip sklearn's per-call
+        # validation, and only the appended row is scaled each step.
+        offset = self.scaler.transform(np.zeros((1, 5)))[0]
+        gain = self.scaler.transform(np.ones((1, 5)))[0] - offset
+        scaled_context = current_context * gain + offset
+        last_row = current_context[-1].copy()
         
         # 2. Iterative Prediction Loop
         # Note: We are predicting MONTHLY points using a DAILY model.
@@ -89,22 +96,16 @@ class AIStockPredictor:
         for m_idx in range(months):
             # Run 20 daily steps to simulate 1 month of movement
             for d_idx in range(20): 
-                scaled_input = self.scaler.transform(current_context)
-                tensor_input = torch.from_numpy(scaled_input).float().unsqueeze(0).to(self.device)
+                # .float() copies, so shifting scaled_context below is safe
+                tensor_input = torch.from_numpy(scaled_context).float().unsqueeze(0).to(self.device)
                 
                 with torch.no_grad():
                     # Predict Scaled Close Price
                     pred_scaled = self.model(tensor_input).item()
                 
                 # Inverse Transform to get Real Price
-                # We assume the model predicts Column 0 (Close)
-                placeholder = np.zeros((1, 5))
-                placeholder[0, 0] = pred_scaled
-                # Fill other columns with mean values/zeros to avoid scaler complaining if it used them?
-                # StandardScaler/MinMaxScaler usually element-wise.
-                # However, we must ensure we don't accidentally inverse transform using Col 4 params for Col 0.
-                # inverse_transform maps x -> (x - min) / scale
-                pred_price = self.scaler.inverse_transform(placeholder)[0, 0]
+                # We assume the model predicts Column 0 (Close), so only Col 0's params apply
+                pred_price = (pred_scaled - offset[0]) / gain[0]
 
                 # --- CHAOS FACTOR ---
                 # Add noise to the implied return
@@ -125,15 +126,14 @@ class AIStockPredictor:
                 new_price = current_price * (1 + final_return)
                 
                 # Update Context (Shift window)
-                # We need to construct a new row. 
                 # REALITY CHECK: We can't easily calculate MACD/RSI on the fly without history.
                 # Engineering Shortcut: Reuse previous technicals but update 'Close' and 'Return'.
-                new_row = current_context[-1].copy()
-                new_row[0] = new_price # Close
-                new_row[4] = final_return # Return
+                last_row[0] = new_price # Close
+                last_row[4] = final_return # Return
                 
-                # Append and shift
-                current_context = np.vstack([current_context[1:], new_row])
+                # Shift in place and scale just the new row
+                scaled_context[:-1] = scaled_context[1:]
+                scaled_context[-1] = last_row * gain + offset
                 current_price = new_price
 
             trajectory.append(int(current_price))
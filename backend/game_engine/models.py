@@ -1,7 +1,11 @@
+import copy
+
 from django.db import models
+from django.utils.functional import cached_property
+from django.core.cache import cache
 from django.core.validators import MinValueValidator
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 
@@ -84,6 +88,7 @@ class GameSession(models.Model):
     """Tracks the user's current run through the game."""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='game_sessions')
     current_month = models.IntegerField(default=1)  # 1 to 60 (5 years)
+    choice_count = models.PositiveIntegerField(default=0)  # Cards answered or skipped (PlayerChoice rows)
     wealth = models.IntegerField(default=25000)     # Starting salary in INR
     happiness = models.IntegerField(default=100)    # Mental Health / Life satisfaction
     credit_score = models.IntegerField(default=700) # CIBIL-like score
@@ -103,23 +108,21 @@ class GameSession(models.Model):
     market_prices = models.JSONField(default=dict)  # {"gold": 100, "tech": 100, "real_estate": 100}
     # Market trends (Momentum) - stores integer -5 to +5 indicating current trend
     market_trends = models.JSONField(default=dict)  # {"gold": 2, "tech": -5, "real_estate": 0}
-    # Player's portfolio (units held per sector)
-    portfolio = models.JSONField(default=dict)  # {"gold": 0, "tech": 0, "real_estate": 0}
     # NEW: Mutual Funds (SIPs and Lumpsum) - {"nifty_50": {"units": 10.5, "invested": 5000}}
     mutual_funds = models.JSONField(default=dict)
     # NEW: IPO Applications - [{"name": "Zomato", "amount": 15000, "status": "APPLIED", "month": 5}]
     active_ipos = models.JSONField(default=list)
     
-    # NEW: Purchase history for profit calculation
-    purchase_history = models.JSONField(default=list)  # [{"sector": "tech", "units": 10, "price": 100, "month": 1}]
-    
     # --- NEW: Recurring Expenses ---
-    # This acts as a CACHE for the total monthly drain, updated by advance_month
+    # CACHE of the active bills' total; adjusted whenever a bill is added, cancelled or inflated
     recurring_expenses = models.IntegerField(default=0)
+    # CACHE of the active DEBT bills' total (EMIs); maintained alongside recurring_expenses
+    total_debt_emi = models.IntegerField(default=0)
 
-    # --- NEW: Gameplay Log & Final Report ---
-    gameplay_log = models.TextField(blank=True, default="")
+    # --- NEW: Final Report (gameplay log lives in GameplayLogEntry) ---
     final_report = models.TextField(blank=True, default="")
+    # Set by the request that claimed generating final_report (conditional UPDATE)
+    report_started_at = models.DateTimeField(null=True, blank=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -128,10 +131,52 @@ class GameSession(models.Model):
         # Initialize market prices if empty
         if not self.market_prices:
             self.market_prices = {"gold": 100, "tech": 100, "real_estate": 100}
-        if not self.portfolio:
-            self.portfolio = {"gold": 0, "tech": 0, "real_estate": 0}
         # Ensure new fields are initialized if not present (logic handled by default in fields, but good for explicit safety where json defaults matter)
         super().save(*args, **kwargs)
+        self._snapshot_state(kwargs.get('update_fields'))
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_state()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        # Covers deferred columns loaded on first access, so they are tracked too.
+        if fields is not None:
+            fields = [self._meta.get_field(name).attname for name in fields]
+        self._snapshot_state(fields)
+
+    def _snapshot_state(self, fields=None):
+        """Remember persisted values; JSON is deep-copied so in-place edits show as dirty."""
+        if fields is None:
+            deferred = self.get_deferred_fields()
+            fields = [f.attname for f in self._meta.concrete_fields if f.attname not in deferred]
+            self._saved_state = {}
+        elif not hasattr(self, '_saved_state'):
+            return
+        self._saved_state.update(copy.deepcopy({name: getattr(self, name) for name in fields}))
+
+    def get_dirty_fields(self):
+        """Fields whose value differs from what was last loaded or saved."""
+        return [
+            name for name, value in self._saved_state.items()
+            if getattr(self, name) != value
+        ]
+
+    def save_dirty(self):
+        """Write only changed fields; a no-op when nothing changed."""
+        if self._state.adding or not hasattr(self, '_saved_state'):
+            self.save()
+            return
+        dirty = self.get_dirty_fields()
+        if dirty:
+            self.save(update_fields=dirty + ['updated_at'])
+
+    def get_holdings(self):
+        """Units held per stock sector (served from prefetch cache when present)."""
+        return {item.sector: item.units for item in self.portfolio_items.all()}
 
     def __str__(self):
         return f"Session {self.id} - User: {self.user.username} - Month: {self.current_month}"
@@ -185,6 +230,24 @@ class TransactionLedger(models.Model):
         return f"{self.transaction_type} {self.units} {self.sector} @ {self.price_per_unit}"
 
 
+class GameplayLogEntry(models.Model):
+    """
+    Append-only gameplay log line, in insertion order.
+    Replaces GameSession.gameplay_log text.
+    """
+    session = models.ForeignKey(GameSession, on_delete=models.CASCADE, related_name='log_entries')
+    month = models.IntegerField()
+    text = models.TextField()
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['session', 'id']),
+        ]
+
+    def __str__(self):
+        return f"Session {self.session_id} M{self.month}: {self.text[:50]}"
+
 
 class IncomeSource(models.Model):
     class SourceType(models.TextChoices):
@@ -218,6 +281,10 @@ class IncomeSource(models.Model):
 class GameHistory(models.Model):
     """Summary of completed games for the profile dashboard."""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='game_history')
+    # Null for games recorded before the link existed
+    session = models.OneToOneField(
+        GameSession, on_delete=models.SET_NULL, null=True, blank=True, related_name='history'
+    )
     final_wealth = models.IntegerField()
     final_happiness = models.IntegerField()
     final_credit_score = models.IntegerField()
@@ -232,6 +299,9 @@ class GameHistory(models.Model):
 
     class Meta:
         ordering = ['-played_at']
+        indexes = [
+            models.Index(fields=['user', '-played_at']),
+        ]
 
 
 class StockHistory(models.Model):
@@ -268,6 +338,11 @@ class FuturesContract(models.Model):
     final_market_price = models.IntegerField(null=True, blank=True)
     is_successful = models.BooleanField(default=False) # True if Strike > Final Price
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['session', 'created_month']),
+        ]
+
     def __str__(self):
         return f"{self.sector} Future - {self.units}u @ {self.strike_price}"
 
@@ -285,9 +360,51 @@ class MarketEvent(models.Model):
     trigger_month = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
 
+    CACHE_KEY = 'active_market_events'
+    # Saves and deletes clear the key at once, but only in the cache this process
+    # sees; with a per-process cache (no REDIS_URL) other workers catch up within this.
+    CACHE_TIMEOUT = 60
+
     def __str__(self):
         return self.title
 
+    @cached_property
+    def shocks(self):
+        """(sector, multiplier, trend, headline) per impacted sector; only the price math is left per turn."""
+        shocks = []
+        for sector, multiplier in self.sector_impacts.items():
+            pct = int((multiplier - 1) * 100)
+            direction = "surged" if pct > 0 else "crashed"
+            shocks.append((
+                sector,
+                multiplier,
+                3 if multiplier > 1 else -3,
+                f"{sector.title()} {direction} {abs(pct)}%",
+            ))
+        return tuple(shocks)
+
+    @classmethod
+    def _load_active(cls):
+        events = {}
+        for event in cls.objects.filter(is_active=True):
+            event.shocks  # computed before caching so it is stored with the event
+            events[event.id] = event
+        return events
+
+    @classmethod
+    def get_active(cls, event_id):
+        """Active event by id from the shared cache, or None (events are read-mostly config)."""
+        if event_id is None:
+            return None
+        events = cache.get_or_set(cls.CACHE_KEY, cls._load_active, cls.CACHE_TIMEOUT)
+        return events.get(event_id)
+
+
+@receiver(post_save, sender=MarketEvent)
+@receiver(post_delete, sender=MarketEvent)
+def invalidate_market_events(sender, **kwargs):
+    cache.delete(MarketEvent.CACHE_KEY)
+
 
 # --- 5. RECURRING EXPENSES ---
 class RecurringExpense(models.Model):
@@ -313,6 +430,11 @@ class RecurringExpense(models.Model):
     is_cancelled = models.BooleanField(default=False)
     cancelled_month = models.IntegerField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['session', 'is_cancelled']),
+        ]
+
     def __str__(self):
         status = "Active" if not self.is_cancelled else "Cancelled"
         type_str = "Needs" if self.is_essential else "Wants"
@@ -400,6 +522,11 @@ class PlayerChoice(models.Model):
     choice = models.ForeignKey(Choice, on_delete=models.CASCADE, null=True, blank=True)  # null = skipped
     chosen_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['session', 'card']),
+        ]
+
     def __str__(self):
         return f"Session {self.session.id} - {self.card.title}"
 
@@ -3,6 +3,7 @@ from .models import (
     GameSession, ScenarioCard, Choice, RecurringExpense,
     PlayerProfile, GameHistory, MarketEvent, PersonaProfile, IncomeSource
 )
+from .services.config import GameEngineConfig
 
 
 
@@ -112,6 +113,7 @@ class GameSessionSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source='user.username', read_only=True)
     active_expenses = serializers.SerializerMethodField()
     income_sources = serializers.SerializerMethodField()
+    portfolio = serializers.SerializerMethodField()
     persona_profile = PersonaProfileSerializer(read_only=True)
 
     class Meta:
@@ -134,6 +136,11 @@ class GameSessionSerializer(serializers.ModelSerializer):
     def get_income_sources(self, obj):
         return IncomeSourceSerializer(obj.income_sources.all(), many=True).data
 
+    def get_portfolio(self, obj):
+        portfolio = dict.fromkeys(GameEngineConfig.CONFIG['STOCK_SECTORS'], 0)
+        portfolio.update(obj.get_holdings())
+        return portfolio
+
 
 class PlayerProfileSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source='user.username', read_only=True)
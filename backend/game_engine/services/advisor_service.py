@@ -7,32 +7,53 @@ and processing scam choices.
 import random
 import logging
 
-from ..models import RecurringExpense
+from django.db import transaction
+from django.db.models import Sum
+
 from ..advisor import GROQ_AVAILABLE as GENAI_AVAILABLE, get_advisor, AdvisorPersona
+from ..models import GameSession
 from .config import GameEngineConfig
 
 logger = logging.getLogger(__name__)
 
+# Chatbot trigger reasons; only the firing branch formats its template.
+_VASOOLI_REASON = "Debt EMI is ₹{emi}/mo, which is {pct:.0f}% of net worth"
+_SUNDAR_REASON = "Player has ₹{wealth:,} cash — ripe for a scam"
+_HARSHAD_REASON = "Cash ₹{wealth:,} sitting idle with zero portfolio"
+_JETTA_DEFICIT_REASON = "Expenses (₹{expenses}) > Income (₹{income})"
+_JETTA_BUSINESS_REASON = "Business Owner profile — Jetta Bhai monitors your margins"
+
 
 class AdvisorService:
     """Proactive AI advice and contextual chatbot characters."""
 
+    # Recurring bills above 60% of the baseline salary trigger a DANGER nudge.
+    _EXPENSE_DANGER_THRESHOLD = GameEngineConfig.CONFIG['MONTHLY_SALARY'] * 6 // 10
+
     @staticmethod
     def _check_advisor_triggers(session):
         """Check for events that warrant proactive advice (legacy fallback)."""
-        advisor = get_advisor()
-        msg = None
-
-        if session.wealth < 5000:
-            msg = advisor.get_proactive_message("CRISIS", "Wealth dropped below 5k", session.wealth, session.happiness, AdvisorPersona.STRICT)
-        elif session.wealth > 100000 and session.current_month % 6 == 0:
-            msg = advisor.get_proactive_message("MILESTONE", "Wealth over 100k", session.wealth, session.happiness, AdvisorPersona.SASSY)
-        elif session.happiness < 30:
-            msg = advisor.get_proactive_message("WARNING", "Happiness dangerously low", session.wealth, session.happiness, AdvisorPersona.FRIENDLY)
-        elif session.recurring_expenses > (25000 * 0.6):
-            msg = advisor.get_proactive_message("DANGER", "Expenses > 60% of income", session.wealth, session.happiness, AdvisorPersona.STRICT)
+        wealth = session.wealth
+        happiness = session.happiness
+        is_milestone = wealth > 100000 and session.current_month % 6 == 0
+
+        # Common case: nothing noteworthy, so skip the advisor entirely.
+        if (
+            wealth >= 5000
+            and not is_milestone
+            and happiness >= 30
+            and session.recurring_expenses <= AdvisorService._EXPENSE_DANGER_THRESHOLD
+        ):
+            return None
 
-        return msg
+        advisor = get_advisor()
+        if wealth < 5000:
+            return advisor.get_proactive_message("CRISIS", "Wealth dropped below 5k", wealth, happiness, AdvisorPersona.STRICT)
+        if is_milestone:
+            return advisor.get_proactive_message("MILESTONE", "Wealth over 100k", wealth, happiness, AdvisorPersona.SASSY)
+        if happiness < 30:
+            return advisor.get_proactive_message("WARNING", "Happiness dangerously low", wealth, happiness, AdvisorPersona.FRIENDLY)
+        return advisor.get_proactive_message("DANGER", "Expenses > 60% of income", wealth, happiness, AdvisorPersona.STRICT)
 
     @staticmethod
     def _check_chatbot_triggers(session):
@@ -49,45 +70,46 @@ class AdvisorService:
         CONFIG = GameEngineConfig.CONFIG
         advisor = get_advisor()
 
-        # --- Calculate Net Worth ---
+        wealth = session.wealth
+        total_debt_emi = session.total_debt_emi
+        # Net worth is at least the cash held, so with cash above twice the EMI
+        # the debt ratio cannot pass 0.5; only then is the portfolio skipped.
+        needs_debt_ratio = session.credit_score < 600 or wealth <= 2 * total_debt_emi
+
+        # --- Calculate Net Worth (only Vasooli and Harshad use it) ---
         portfolio_value = 0
         portfolio_empty = True
-        if session.portfolio and session.market_prices:
-            for sector, units in session.portfolio.items():
-                if units > 0:
-                    portfolio_empty = False
-                price = session.market_prices.get(sector, 0)
-                portfolio_value += int(units * price)
-        net_worth = session.wealth + portfolio_value
-
-        # --- Calculate Debt Ratio ---
-        debt_expenses = RecurringExpense.objects.filter(
-            session=session, category='DEBT', is_cancelled=False
-        )
-        total_debt_emi = sum(e.amount for e in debt_expenses)
-        debt_ratio = total_debt_emi / max(net_worth, 1) if net_worth > 0 else 1.0
+        if needs_debt_ratio or wealth > 50000:
+            # Single pass over the few held sectors; NumPy arrays would cost more to build than to sum
+            prices = session.market_prices
+            holdings = session.get_holdings() if prices else {}
+            portfolio_value = sum(int(units * prices.get(sector, 0)) for sector, units in holdings.items())
+            portfolio_empty = not any(units > 0 for units in holdings.values())
 
         # --- 1. VASOOLI BHAI: Debt Crisis ---
-        if session.credit_score < 600 or debt_ratio > 0.5:
-            msg = advisor.get_character_message(
-                character='vasooli',
-                trigger_reason=f"Debt EMI is ₹{total_debt_emi}/mo, which is {debt_ratio * 100:.0f}% of net worth",
-                current_wealth=session.wealth,
-                current_happiness=session.happiness,
-            )
-            return {
-                'character': msg.character,
-                'message': msg.message,
-                'choices': msg.choices,
-                'is_scam': msg.is_scam,
-                'scam_loss_amount': msg.scam_loss_amount,
-            }
+        if needs_debt_ratio:
+            net_worth = wealth + portfolio_value
+            debt_ratio = total_debt_emi / max(net_worth, 1) if net_worth > 0 else 1.0
+            if session.credit_score < 600 or debt_ratio > 0.5:
+                msg = advisor.get_character_message(
+                    character='vasooli',
+                    trigger_reason=_VASOOLI_REASON.format(emi=total_debt_emi, pct=debt_ratio * 100),
+                    current_wealth=session.wealth,
+                    current_happiness=session.happiness,
+                )
+                return {
+                    'character': msg.character,
+                    'message': msg.message,
+                    'choices': msg.choices,
+                    'is_scam': msg.is_scam,
+                    'scam_loss_amount': msg.scam_loss_amount,
+                }
 
         # --- 2. SUNDAR: Random Scam (10% chance, only if wealth > 10k) ---
         if session.wealth > 10000 and random.random() < 0.10:
             msg = advisor.get_character_message(
                 character='sundar',
-                trigger_reason=f"Player has ₹{session.wealth:,} cash — ripe for a scam",
+                trigger_reason=_SUNDAR_REASON.format(wealth=session.wealth),
                 current_wealth=session.wealth,
                 current_happiness=session.happiness,
             )
@@ -103,7 +125,7 @@ class AdvisorService:
         if session.wealth > 50000 and portfolio_empty:
             msg = advisor.get_character_message(
                 character='harshad',
-                trigger_reason=f"Cash ₹{session.wealth:,} sitting idle with zero portfolio",
+                trigger_reason=_HARSHAD_REASON.format(wealth=session.wealth),
                 current_wealth=session.wealth,
                 current_happiness=session.happiness,
             )
@@ -124,22 +146,24 @@ class AdvisorService:
         except Exception:
             pass
 
-        # Check Cash Flow (Expenses > Income)
-        total_income = sum(src.amount_base for src in session.income_sources.all())
-        # Fallback if no income sources yet (rare)
-        if total_income == 0: 
-            total_income = 1 # Prevent div by zero logical errors if needed, but here just comparison
-
-        is_deficit = session.recurring_expenses > total_income
-
-        if is_business or is_deficit:
+        if is_business:
+            trigger_reason = _JETTA_BUSINESS_REASON
+        else:
+            # Check Cash Flow (Expenses > Income); business owners never need the income query
+            total_income = session.income_sources.aggregate(total=Sum('amount_base'))['total'] or 0
+            # Fallback if no income sources yet (rare)
+            if total_income == 0:
+                total_income = 1 # Prevent div by zero logical errors if needed, but here just comparison
+            trigger_reason = None
+            if session.recurring_expenses > total_income:
+                trigger_reason = _JETTA_DEFICIT_REASON.format(
+                    expenses=session.recurring_expenses, income=total_income
+                )
+
+        if trigger_reason:
             msg = advisor.get_character_message(
                 character='jetta',
-                trigger_reason=(
-                    f"Expenses (₹{session.recurring_expenses}) > Income (₹{total_income})"
-                    if not is_business
-                    else "Business Owner profile — Jetta Bhai monitors your margins"
-                ),
+                trigger_reason=trigger_reason,
                 current_wealth=session.wealth,
                 current_happiness=session.happiness,
             )
@@ -154,24 +178,31 @@ class AdvisorService:
         return None
 
     @staticmethod
+    @transaction.atomic
     def process_scam_choice(session, accepted: bool, scam_loss_amount: int):
         """
         Handle the player's response to Sundar's scam offer.
         """
-        from .game_service import GameService
+        from .game_service import GameService, _clamp_happiness
+
+        # Lock the session row; the save and any game-over writes commit together.
+        # is_active is re-checked under the lock so a reply racing game over is refused.
+        session = GameSession.objects.select_for_update().filter(pk=session.pk, is_active=True).first()
+        if session is None:
+            return {'error': "This game is already over."}
 
         if accepted:
             session.wealth -= scam_loss_amount
             session.happiness -= 15
             session.financial_literacy -= 5
-            session.happiness = GameService._clamp(session.happiness, 0, 100)
+            session.happiness = _clamp_happiness(session.happiness)
             session.financial_literacy = max(0, session.financial_literacy)
 
             GameService._append_gameplay_log(
                 session,
                 f"Month {session.current_month}: FELL FOR SCAM! Lost ₹{scam_loss_amount} to Sundar's scheme.",
             )
-            session.save()
+            session.save_dirty()
 
             game_over, reason = GameService._check_game_over(session)
             if game_over:
@@ -193,7 +224,7 @@ class AdvisorService:
                 session,
                 f"Month {session.current_month}: Ignored Sundar's scam. Smart move!",
             )
-            session.save()
+            session.save_dirty()
 
             return {
                 'message': (
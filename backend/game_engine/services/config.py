@@ -4,12 +4,14 @@ GameEngine configuration constants.
 All game tuning knobs live here so they can be imported independently
 without pulling in Django models or external libraries.
 """
+from types import MappingProxyType
 
 
 class GameEngineConfig:
     """Namespace for game configuration constants."""
 
-    CONFIG = {
+    # Read-only view: tuning happens here, never at runtime.
+    CONFIG = MappingProxyType({
         'STARTING_WEALTH': 25000,
         'HAPPINESS_START': 100,
         'CREDIT_SCORE_START': 700,
@@ -21,7 +23,7 @@ class GameEngineConfig:
         'MIN_CREDIT': 300,
         'MAX_CREDIT': 900,
         'MONTHLY_SALARY': 25000,
-        'STOCK_SECTORS': ['gold', 'tech', 'real_estate'],
+        'STOCK_SECTORS': ('gold', 'tech', 'real_estate'),
         'LEVEL_THRESHOLDS': [
             {'level': 1, 'min_month': 1, 'min_literacy': 0, 'desc': 'The Basics'},
             {'level': 2, 'min_month': 6, 'min_literacy': 20, 'desc': 'Credit & Debt'},
@@ -51,6 +53,14 @@ class GameEngineConfig:
                 'categories': None  # All
             }
         },
+        # Deck draw weight per card difficulty, by player literacy bracket:
+        # novices mostly see easy cards, experts mostly hard ones.
+        'DIFFICULTY_WEIGHTS': [
+            {'min_literacy': 0, 'weights': {1: 4.0, 2: 2.0, 3: 1.0, 4: 0.5, 5: 0.5}},
+            {'min_literacy': 30, 'weights': {1: 2.0, 2: 3.0, 3: 2.0, 4: 1.0, 5: 0.5}},
+            {'min_literacy': 60, 'weights': {1: 1.0, 2: 2.0, 3: 3.0, 4: 2.0, 5: 1.0}},
+            {'min_literacy': 85, 'weights': {1: 0.5, 2: 1.0, 3: 2.0, 4: 3.0, 5: 3.0}},
+        ],
         'LEVEL_UNLOCKS': {
             'loans': 2,
             'investing': 3,
@@ -68,13 +78,19 @@ class GameEngineConfig:
             18: {'name': 'Paytm', 'price_band': 2150, 'listing_gain_prob': 0.1},
             24: {'name': 'Tata Tech', 'price_band': 500, 'listing_gain_prob': 0.9}
         }
-    }
+    })
 
 
-REPORT_PROMPT_TEMPLATE = (
+# The report prompt is split so the invariant instructions always form an
+# identical leading prefix (eligible for provider-side prefix caching) and
+# only the per-session tail varies.
+REPORT_PROMPT_STATIC = (
     "You are an expert financial coach. Generate a concise Markdown report for the player. "
     "Use the sections: Summary, Highlights, Risks, Recommendations. "
     "Be supportive, specific, and keep it under 400 words.\n\n"
+)
+
+REPORT_PROMPT_DYNAMIC = (
     "Game outcome reason: {reason}\n"
     "Final month: {current_month}\n"
     "Final wealth: ₹{wealth}\n"
@@ -86,3 +102,23 @@ REPORT_PROMPT_TEMPLATE = (
     "Portfolio breakdown: {portfolio_breakdown}\n\n"
     "Gameplay log:\n{gameplay_log}\n"
 )
+
+REPORT_PROMPT_TEMPLATE = REPORT_PROMPT_STATIC + REPORT_PROMPT_DYNAMIC
+
+# Offline report used when Gemini is unavailable or fails.
+FALLBACK_REPORT_TEMPLATE = (
+    "## Summary\n"
+    "- Outcome: **{reason}** after month **{current_month}**.\n"
+    "- Final cash: **₹{wealth}**. Portfolio value: **₹{portfolio_value}**.\n"
+    "- Happiness: **{happiness}**. Credit score: **{credit_score}**.\n\n"
+    "## Highlights\n"
+    "- Portfolio: {portfolio_breakdown}\n"
+    "- Recurring expenses: ₹{recurring_expenses}\n\n"
+    "## Risks\n"
+    "- Watch cash flow relative to recurring bills.\n"
+    "- Keep credit score healthy by avoiding high-interest debt.\n\n"
+    "## Recommendations\n"
+    "- Build a 3–6 month emergency fund.\n"
+    "- Automate savings with a monthly SIP.\n"
+    "- Review recurring expenses and cancel low-value subscriptions.\n"
+)
@@ -8,22 +8,141 @@ import os
 import random
 import logging
 import uuid
+import threading
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
+from django.db import connection, transaction
+from django.db.models import (
+    Case, Exists, F, FloatField, IntegerField, OuterRef, Value, When, prefetch_related_objects,
+)
+from django.db.models.functions import Cast, Floor, Power, Random
 
 from ..models import (
     GameSession, PlayerChoice, RecurringExpense, ScenarioCard,
-    StockHistory, IncomeSource, MarketTickerData, PersonaProfile
+    StockHistory, IncomeSource, MarketTickerData, PersonaProfile, GameplayLogEntry, MarketEvent,
 )
 from ..ml.predictor import AIStockPredictor
 from ..advisor import GROQ_AVAILABLE as GENAI_AVAILABLE, get_advisor, AdvisorPersona
 from ..ai_engine import get_ai_master
 
 from .config import GameEngineConfig
+from .market_service import _IPO_BY_NAME
 
 logger = logging.getLogger(__name__)
 
+# Level tiers are sorted ascending on both axes, so the reached tier is the
+# furthest one that either month or literacy has crossed.
+_LEVEL_THRESHOLDS = GameEngineConfig.CONFIG['LEVEL_THRESHOLDS']
+_LEVEL_MIN_MONTHS = tuple(t['min_month'] for t in _LEVEL_THRESHOLDS)
+_LEVEL_MIN_LITERACY = tuple(t['min_literacy'] for t in _LEVEL_THRESHOLDS)
+_LEVEL_DESCS = {t['level']: t['desc'] for t in _LEVEL_THRESHOLDS}
+
+# Draw weight per difficulty as a CASE expression, one per literacy bracket.
+_DIFFICULTY_BRACKETS = GameEngineConfig.CONFIG['DIFFICULTY_WEIGHTS']
+_DIFFICULTY_MIN_LITERACY = tuple(b['min_literacy'] for b in _DIFFICULTY_BRACKETS)
+_DIFFICULTY_WEIGHT_CASES = tuple(
+    Case(
+        *(When(difficulty=d, then=Value(w)) for d, w in b['weights'].items()),
+        default=Value(1.0),
+        output_field=FloatField(),
+    )
+    for b in _DIFFICULTY_BRACKETS
+)
+
+# Starter bills for every new session.
+_DEFAULT_EXPENSES = (
+    {'name': 'Rent (2BHK)', 'amount': 10000, 'category': 'HOUSING', 'is_essential': True, 'inflation': 0.05},
+    {'name': 'Groceries', 'amount': 2500, 'category': 'FOOD', 'is_essential': True, 'inflation': 0.07},
+    {'name': 'Utilities (Electricity/Water)', 'amount': 1000, 'category': 'UTILITIES', 'is_essential': True, 'inflation': 0.03},
+    {'name': 'Transport (Metro/Bus)', 'amount': 1000, 'category': 'TRANSPORT', 'is_essential': True, 'inflation': 0.05},
+)
+_DEFAULT_EXPENSE_TOTAL = sum(exp['amount'] for exp in _DEFAULT_EXPENSES)
+
+# Hot per-turn settings, bound once instead of looked up on every call.
+_CARDS_PER_MONTH = GameEngineConfig.CONFIG['CARDS_PER_MONTH']
+_MIN_HAPPINESS = GameEngineConfig.CONFIG['MIN_HAPPINESS']
+_GAME_DURATION_MONTHS = GameEngineConfig.CONFIG['GAME_DURATION_MONTHS']
+_LEVEL_CARD_FILTERS = GameEngineConfig.CONFIG['LEVEL_CARD_FILTERS']
+_DEFAULT_LEVEL_FILTER = _LEVEL_CARD_FILTERS[1]
+
+# Bills inflate on each anniversary of month 1 (13, 25, ...), up to the last playable month.
+_INFLATION_MONTHS = frozenset(range(13, _GAME_DURATION_MONTHS + 2, 12))
+
+# Monthly stat decay: cash stress below the threshold, and a drift down from near-max happiness.
+_STRESS_WEALTH = 10000
+_STRESS_HAPPINESS_LOSS = 2
+_HAPPINESS_DRIFT_ABOVE = 90
+
+# Display label per income source type, as get_source_type_display() would give.
+_SOURCE_TYPE_LABELS = dict(IncomeSource.SourceType.choices)
+
+# Starting (wealth, credit score, monthly income, income source type) per career stage.
+_CAREER_STATS = {
+    'STUDENT_FULLY_FUNDED': (5000, 650, 5000, 'ALLOWANCE'),
+    'STUDENT_PART_TIME': (10000, 680, 8000, 'FREELANCE'),
+    'FRESHER': (20000, 700, 25000, 'SALARY'),
+    'PROFESSIONAL': (100000, 750, 80000, 'SALARY'),
+    'BUSINESS_OWNER': (50000, 720, 60000, 'BUSINESS'),
+    'RETIRED': (500000, 800, 30000, 'OTHER'),  # Pension
+}
+_DEFAULT_CAREER_STATS = (
+    GameEngineConfig.CONFIG['STARTING_WEALTH'],
+    GameEngineConfig.CONFIG['CREDIT_SCORE_START'],
+    GameEngineConfig.CONFIG['MONTHLY_SALARY'],
+    'SALARY',
+)
+
+# Relations every session response serializes (username, persona); joined
+# wherever a turn loads the session so serializing doesn't query them.
+_SESSION_RELATED = ('user', 'persona_profile')
+
+# Zeroed per-sector template; callers take a .copy() for each new session.
+_ZERO_SECTORS = dict.fromkeys(GameEngineConfig.CONFIG['STOCK_SECTORS'], 0)
+
+# AI scenarios are generated in the background and picked up on the
+# player's next card request, so LLM latency hides behind think-time.
+# The finished card's id is handed over through the cache (any worker can
+# serve it; abandoned sessions' entries expire); only in-flight jobs are local.
+_ai_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='ai-scenario')
+_ai_pending = set()  # session ids with a job queued or running in this process
+_ai_pending_lock = threading.Lock()
+_AI_CARD_CACHE_KEY = 'ai_card:{}'
+_AI_CARD_TIMEOUT = 60 * 30
+
+
+def _clamp_happiness(value):
+    """Happiness bounds 0..100, as comparisons rather than nested min/max calls."""
+    return 0 if value < 0 else (100 if value > 100 else value)
+
+
+def _clamp_credit(value):
+    """Credit score bounds 300..900."""
+    return 300 if value < 300 else (900 if value > 900 else value)
+
+
+def _generate_ai_card(session_id, profile, wealth, month, category):
+    """Executor task: build one AI scenario card and publish its id, never raising."""
+    try:
+        card = get_ai_master().generate_scenario(
+            profile=profile,
+            wealth=wealth,
+            month=month,
+            category=category
+        )
+        if card:
+            cache.set(_AI_CARD_CACHE_KEY.format(session_id), card.id, _AI_CARD_TIMEOUT)
+    except Exception as e:
+        logger.warning("AI Generation failed: %s", e)
+    finally:
+        with _ai_pending_lock:
+            _ai_pending.discard(session_id)
+        # Worker threads own their DB connection; don't leak it.
+        connection.close()
+
 
 class GameService:
     """Session management and core gameplay loop."""
@@ -35,14 +154,14 @@ class GameService:
         SECURITY CRITICAL: Ensure the session belongs to the requesting user.
         Raises PermissionDenied if mismatch.
         """
-        if session.user != user:
+        # Compare ids: no lazy SELECT of the session's user
+        if session.user_id != user.pk:
             raise PermissionDenied("You do not own this game session.")
 
     # ================= SESSION MANAGEMENT =================
     @staticmethod
     def start_new_session(user, career_stage=None, risk_appetite=None, user_name=None):
         """Initialize a new game session with optional user choices."""
-        from django.db import transaction
         CONFIG = GameEngineConfig.CONFIG
 
         # Default values if not provided
@@ -53,151 +172,101 @@ class GameService:
             risk_appetite = PersonaProfile.RiskAppetite.MEDIUM
 
         # Set financial stats based on Career Stage
-        if career_stage == 'STUDENT_FULLY_FUNDED':
-            wealth = 5000
-            credit_score = 650
-            income_amount = 5000
-            income_source_type = 'ALLOWANCE'
-        elif career_stage == 'STUDENT_PART_TIME':
-            wealth = 10000
-            credit_score = 680
-            income_amount = 8000
-            income_source_type = 'FREELANCE'
-        elif career_stage == 'FRESHER':
-            wealth = 20000
-            credit_score = 700
-            income_amount = 25000
-            income_source_type = 'SALARY'
-        elif career_stage == 'PROFESSIONAL':
-            wealth = 100000
-            credit_score = 750
-            income_amount = 80000
-            income_source_type = 'SALARY'
-        elif career_stage == 'BUSINESS_OWNER':
-            wealth = 50000
-            credit_score = 720
-            income_amount = 60000
-            income_source_type = 'BUSINESS'
-        elif career_stage == 'RETIRED':
-            wealth = 500000
-            credit_score = 800
-            income_amount = 30000
-            income_source_type = 'OTHER' # Pension
-        else:
-            # Fallback
-            wealth = CONFIG['STARTING_WEALTH']
-            credit_score = CONFIG['CREDIT_SCORE_START']
-            income_amount = CONFIG['MONTHLY_SALARY']
-            income_source_type = 'SALARY'
-
-        with transaction.atomic():
-            session = GameSession.objects.create(
-                user=user,
-                wealth=wealth,
-                happiness=CONFIG['HAPPINESS_START'],
-                credit_score=credit_score,
-                current_month=CONFIG['START_MONTH'],
-                monthly_salary=income_amount  # Set dynamic salary
-            )
-        
-        session.current_level = GameService._calculate_level(session)
-        session.market_trends = {s: 0 for s in CONFIG['STOCK_SECTORS']}
-        session.save()
-        
-        # Create Persona Profile
-        PersonaProfile.objects.create(
-            session=session,
-            career_stage=career_stage,
-            responsibility_level=PersonaProfile.ResponsibilityLevel.MEDIUM, # Default
-            risk_appetite=risk_appetite
-        )
-        
-        # Create Primary Income Source
-        IncomeSource.objects.create(
-            session=session,
-            source_type=income_source_type,
-            amount_base=income_amount,
-            variability=0.1 if income_source_type in ['BUSINESS', 'FREELANCE'] else 0.0,
-            frequency='MONTHLY'
+        wealth, credit_score, income_amount, income_source_type = _CAREER_STATS.get(
+            career_stage, _DEFAULT_CAREER_STATS
         )
 
-        # --- Generate Deterministic Market History ---
+        # --- Generate Deterministic Market History (before any row is written) ---
         ticker = 'RELIANCE.NS'
-        seed_qs = MarketTickerData.objects.filter(ticker=ticker).order_by('-date')[:60]
+        # One fetch serves both the "enough seed data?" check and the forecast input
+        seed_rows = list(
+            MarketTickerData.objects.filter(ticker=ticker).order_by('-date')
+            .values('close', 'rsi', 'macd', 'signal', 'daily_return')[:60]
+        )
 
         initial_prices = {}
 
-        if seed_qs.count() < 60:
+        if len(seed_rows) < 60:
             logger.warning("Insufficient seed data for AI. Using fallback simulation.")
             initial_prices = {"gold": 1800, "tech": 500, "real_estate": 300}
 
-            for sector in CONFIG['STOCK_SECTORS']:
-                prices = [initial_prices.get(sector, 100) for _ in range(12)]
-                history_objs = [
-                    StockHistory(session=session, sector=sector, month=i + 1, price=p)
-                    for i, p in enumerate(prices)
-                ]
-                StockHistory.objects.bulk_create(history_objs)
+            sector_prices = {
+                sector: [initial_prices.get(sector, 100)] * 12
+                for sector in CONFIG['STOCK_SECTORS']
+            }
         else:
             import pandas as pd
-            seed_data = pd.DataFrame(list(seed_qs.values(
-                'close', 'rsi', 'macd', 'signal', 'daily_return'
-            )))
+            seed_data = pd.DataFrame(seed_rows)
             seed_data = seed_data.iloc[::-1]
 
             predictor = AIStockPredictor(ticker='RELIANCE')
             tech_prices = predictor.generate_forecast(seed_data, months=12)
 
-            history_objs = [
-                StockHistory(session=session, sector='tech', month=i + 1, price=p)
-                for i, p in enumerate(tech_prices)
-            ]
-
-            gold_prices = predictor._fallback_generator(1800, 12)
-            history_objs += [
-                StockHistory(session=session, sector='gold', month=i + 1, price=p)
-                for i, p in enumerate(gold_prices)
-            ]
-
-            re_prices = predictor._fallback_generator(300, 12)
-            history_objs += [
-                StockHistory(session=session, sector='real_estate', month=i + 1, price=p)
-                for i, p in enumerate(re_prices)
-            ]
-
-            StockHistory.objects.bulk_create(history_objs)
-
-            initial_prices['tech'] = tech_prices[0]
-            initial_prices['gold'] = gold_prices[0]
-            initial_prices['real_estate'] = re_prices[0]
+            sector_prices = {
+                'tech': tech_prices,
+                'gold': predictor._fallback_generator(1800, 12),
+                'real_estate': predictor._fallback_generator(300, 12),
+            }
+            initial_prices = {sector: prices[0] for sector, prices in sector_prices.items()}
 
         # Initialize Mutual Fund NAVs
         for mf_key in CONFIG['MUTUAL_FUNDS']:
             initial_prices[f"MF_{mf_key}"] = 100
 
-        session.market_prices = initial_prices
-        session.portfolio = {s: 0 for s in CONFIG['STOCK_SECTORS']}
-        session.save()
+        # All writes share one transaction (one commit); the forecast above stays outside it.
+        with transaction.atomic():
+            # One INSERT with every starting field, instead of an INSERT plus two UPDATEs
+            session = GameSession(
+                user=user,
+                wealth=wealth,
+                happiness=CONFIG['HAPPINESS_START'],
+                credit_score=credit_score,
+                current_month=CONFIG['START_MONTH'],
+                monthly_salary=income_amount,  # Set dynamic salary
+                market_prices=initial_prices,
+                market_trends=_ZERO_SECTORS.copy(),
+                recurring_expenses=_DEFAULT_EXPENSE_TOTAL,
+            )
+            session.current_level = GameService._calculate_level(session)
+            session.save()
 
-        # --- Initialize Monthly Bills ---
-        default_expenses = [
-            {'name': 'Rent (2BHK)', 'amount': 10000, 'category': 'HOUSING', 'is_essential': True, 'inflation': 0.05},
-            {'name': 'Groceries', 'amount': 2500, 'category': 'FOOD', 'is_essential': True, 'inflation': 0.07},
-            {'name': 'Utilities (Electricity/Water)', 'amount': 1000, 'category': 'UTILITIES', 'is_essential': True, 'inflation': 0.03},
-            {'name': 'Transport (Metro/Bus)', 'amount': 1000, 'category': 'TRANSPORT', 'is_essential': True, 'inflation': 0.05}
-        ]
+            # Create Persona Profile
+            PersonaProfile.objects.create(
+                session=session,
+                career_stage=career_stage,
+                responsibility_level=PersonaProfile.ResponsibilityLevel.MEDIUM, # Default
+                risk_appetite=risk_appetite
+            )
 
-        for exp in default_expenses:
-            RecurringExpense.objects.create(
+            # Create Primary Income Source
+            IncomeSource.objects.create(
                 session=session,
-                name=exp['name'],
-                amount=exp['amount'],
-                category=exp['category'],
-                is_essential=exp['is_essential'],
-                inflation_rate=exp['inflation'],
-                started_month=session.current_month
+                source_type=income_source_type,
+                amount_base=income_amount,
+                variability=0.1 if income_source_type in ['BUSINESS', 'FREELANCE'] else 0.0,
+                frequency='MONTHLY'
             )
 
+            StockHistory.objects.bulk_create([
+                StockHistory(session=session, sector=sector, month=i + 1, price=p)
+                for sector, prices in sector_prices.items()
+                for i, p in enumerate(prices)
+            ])
+
+            # --- Initialize Monthly Bills ---
+            RecurringExpense.objects.bulk_create([
+                RecurringExpense(
+                    session=session,
+                    name=exp['name'],
+                    amount=exp['amount'],
+                    category=exp['category'],
+                    is_essential=exp['is_essential'],
+                    inflation_rate=exp['inflation'],
+                    started_month=session.current_month
+                )
+                for exp in _DEFAULT_EXPENSES
+            ])
+
         return session
 
     # ================= CORE GAMEPLAY =================
@@ -205,44 +274,25 @@ class GameService:
     def get_next_card(session):
         """
         Smart Scenario Selection with AI Integration.
-        - 30% chance to generate a fresh AI scenario.
-        - Fallback to DB deck if AI fails or skipped.
+        - 30% chance to queue a fresh AI scenario for the next turn.
+        - Serves a queued AI scenario once it has finished generating.
+        - Fallback to DB deck if AI fails, is pending, or skipped.
         - Avoids repeats.
         """
-        CONFIG = GameEngineConfig.CONFIG
         GameService._refresh_level(session)
 
-        # --- AI GENERATION ATTEMPT ---
+        # --- AI GENERATION (prefetched last turn) ---
+        ai_card = GameService._take_prefetched_ai_card(session)
         if random.random() < 0.3:
-            try:
-                profile = session.persona_profile
-                if profile:
-                    ai_master = get_ai_master()
-                    level_categories = CONFIG['LEVEL_CARD_FILTERS'].get(
-                        session.current_level,
-                        CONFIG['LEVEL_CARD_FILTERS'][1]
-                    )['categories']
-
-                    category = random.choice(level_categories) if level_categories else "WANTS"
-
-                    ai_card = ai_master.generate_scenario(
-                        profile=profile,
-                        wealth=session.wealth,
-                        month=session.current_month,
-                        category=category
-                    )
-
-                    if ai_card:
-                        return ai_card
-            except Exception as e:
-                logger.warning("AI Generation failed: %s", e)
+            GameService._prefetch_ai_card(session)
+        if ai_card:
+            prefetch_related_objects([ai_card], 'choices')
+            return ai_card
 
         # --- SCENARIO TIERING (Fix for Instant Death) ---
-        level_filters = CONFIG['LEVEL_CARD_FILTERS'].get(
-            session.current_level, 
-            CONFIG['LEVEL_CARD_FILTERS'][1]
-        )
-        shown_ids = list(PlayerChoice.objects.filter(session=session).values_list('card_id', flat=True))
+        level_filters = _LEVEL_CARD_FILTERS.get(session.current_level, _DEFAULT_LEVEL_FILTER)
+        # Correlated NOT EXISTS instead of shipping every shown id back as IN (...)
+        unseen = ~Exists(PlayerChoice.objects.filter(session=session, card=OuterRef('pk')))
         max_difficulty = level_filters['max_difficulty']
         
         # TIER 1 SAFETY: Month 1-2 OR Wealth < 15k -> Max Difficulty 1
@@ -256,38 +306,93 @@ class GameService:
             is_generated=False,
             min_month__lte=session.current_month,
             difficulty__lte=max_difficulty
-        ).exclude(id__in=shown_ids)
+        ).filter(unseen)
 
         if level_filters['categories']:
             available = available.filter(category__in=level_filters['categories'])
 
         # Fallback 1: Relax difficulty filter if no cards
-        if not available.exists():
-            available = ScenarioCard.objects.filter(
-                is_active=True,
-                is_generated=False,
-                min_month__lte=session.current_month,
-                difficulty__lte=max_difficulty + 1 # Slight relax
-            ).exclude(id__in=shown_ids)
+        relaxed = ScenarioCard.objects.filter(
+            is_active=True,
+            is_generated=False,
+            min_month__lte=session.current_month,
+            difficulty__lte=max_difficulty + 1 # Slight relax
+        ).filter(unseen)
 
         # Fallback 2: Any active card
-        if not available.exists():
-            available = ScenarioCard.objects.filter(
-                is_active=True,
-                is_generated=False,
-                min_month__lte=session.current_month
-            )
+        any_card = ScenarioCard.objects.filter(
+            is_active=True,
+            is_generated=False,
+            min_month__lte=session.current_month
+        )
 
-        if not available.exists():
-            return None
+        for candidates in (available, relaxed, any_card):
+            card = None
+            # Additional Safety: If wealth is critical (< 5000), try to find a gain card or low cost
+            if session.wealth < 5000:
+                card = GameService._pick_random_card(session, candidates.exclude(category='EMERGENCY'))
+            card = card or GameService._pick_random_card(session, candidates)
+            if card:
+                # Prefetch only the chosen card's choices, not the whole candidate pool
+                prefetch_related_objects([card], 'choices')
+                return card
+
+        return None
+
+    @staticmethod
+    def get_card(card_id):
+        """Card by id with its choices loaded; raises ScenarioCard.DoesNotExist."""
+        return ScenarioCard.objects.prefetch_related('choices').get(id=card_id)
+
+    @staticmethod
+    def _pick_random_card(session, candidates):
+        """
+        Weighted draw done in SQL so only the chosen card is transferred.
+        Each row scores RANDOM()^(1/weight) and the top score wins, which
+        picks cards in proportion to their difficulty weight.
+        """
+        bracket = bisect_right(_DIFFICULTY_MIN_LITERACY, session.financial_literacy) - 1
+        weight = _DIFFICULTY_WEIGHT_CASES[max(bracket, 0)]
+        return candidates.annotate(
+            draw=Power(Random(), Value(1.0) / weight)
+        ).order_by('-draw').first()
+
+    @staticmethod
+    def _prefetch_ai_card(session):
+        """Queue background AI generation of this session's next card."""
+        try:
+            profile = session.persona_profile
+        except PersonaProfile.DoesNotExist:
+            return
+
+        level_categories = _LEVEL_CARD_FILTERS.get(session.current_level, _DEFAULT_LEVEL_FILTER)['categories']
+        category = random.choice(level_categories) if level_categories else "WANTS"
+
+        if cache.get(_AI_CARD_CACHE_KEY.format(session.id)) is not None:
+            return  # last one not served yet
+        with _ai_pending_lock:
+            if session.id in _ai_pending:
+                return
+            _ai_pending.add(session.id)
+        _ai_executor.submit(
+            _generate_ai_card, session.id, profile, session.wealth, session.current_month, category
+        )
 
-        # Additional Safety: If wealth is critical (< 5000), try to find a gain card or low cost
-        if session.wealth < 5000:
-             safe_cards = [c for c in available if c.category != 'EMERGENCY']
-             if safe_cards:
-                 return random.choice(safe_cards)
+    @staticmethod
+    def _take_prefetched_ai_card(session):
+        """Pop a finished background AI card for this session, if any."""
+        key = _AI_CARD_CACHE_KEY.format(session.id)
+        card_id = cache.get(key)
+        # delete() reports whether this call removed the key: exactly one
+        # of two racing card requests wins the claim and serves the card.
+        if card_id is None or not cache.delete(key):
+            return None
+        return ScenarioCard.objects.filter(pk=card_id).first()
 
-        return random.choice(list(available))
+    @staticmethod
+    def _discard_prefetched_ai_card(session):
+        """Forget any finished AI card, e.g. once the game has ended."""
+        cache.delete(_AI_CARD_CACHE_KEY.format(session.id))
 
     @staticmethod
     def use_lifeline(session, card):
@@ -296,12 +401,14 @@ class GameService:
             return {'error': "No lifelines remaining."}
 
         session.lifelines -= 1
-        session.save()
+        session.save_dirty()
 
-        rec_choice = card.choices.filter(is_recommended=True).first()
+        # Scan in Python so a prefetched card.choices cache is reused
+        choices = list(card.choices.all())
+        rec_choice = next((c for c in choices if c.is_recommended), None)
 
         if not rec_choice:
-            rec_choice = card.choices.order_by('-happiness_impact').first()
+            rec_choice = max(choices, key=lambda c: c.happiness_impact, default=None)
 
         return {
             'success': True,
@@ -311,128 +418,139 @@ class GameService:
         }
 
     @staticmethod
+    @transaction.atomic
     def process_choice(session, card, choice):
         """Main game loop step."""
         # Late import to avoid circular dependency
         from . import GameEngine
-        from django.db import transaction
 
-        with transaction.atomic():
-            GameService._append_gameplay_log(
-                session,
-                (
-                    f"Month {session.current_month}: {card.title} — {choice.text}. "
-                    f"Impact: wealth {choice.wealth_impact:+}, happiness {choice.happiness_impact:+}, "
-                    f"credit {choice.credit_impact:+}, literacy {choice.literacy_impact:+}."
-                ),
-            )
+        # Lock the row for the whole turn so a double-submit waits and then
+        # sees this turn's choice_count instead of replaying the month rollover,
+        # or finds the game already over (DoesNotExist) instead of finalizing twice.
+        # User and persona ride along for the chatbot triggers and the serializer.
+        session = GameSession.objects.select_related(*_SESSION_RELATED).select_for_update(
+            of=('self',)
+        ).get(pk=session.pk, is_active=True)
 
-            # 1. Apply Direct Impacts
-            session.wealth += choice.wealth_impact
-            session.happiness += choice.happiness_impact
-            session.credit_score += choice.credit_impact
-            session.financial_literacy += choice.literacy_impact
+        GameService._append_gameplay_log(
+            session,
+            (
+                f"Month {session.current_month}: {card.title} — {choice.text}. "
+                f"Impact: wealth {choice.wealth_impact:+}, happiness {choice.happiness_impact:+}, "
+                f"credit {choice.credit_impact:+}, literacy {choice.literacy_impact:+}."
+            ),
+        )
 
-            session.happiness = GameService._clamp(session.happiness, 0, 100)
-            session.credit_score = GameService._clamp(session.credit_score, 300, 900)
+        # 1. Apply Direct Impacts
+        session.wealth += choice.wealth_impact
+        session.happiness += choice.happiness_impact
+        session.credit_score += choice.credit_impact
+        session.financial_literacy += choice.literacy_impact
 
-            feedback_parts = []
-            if choice.feedback:
-                feedback_parts.append(choice.feedback)
+        session.happiness = _clamp_happiness(session.happiness)
+        session.credit_score = _clamp_credit(session.credit_score)
 
-            # 2. Handle Recurring Expenses (Add/Remove)
-            if choice.adds_recurring_expense > 0:
-                RecurringExpense.objects.create(
-                    session=session,
-                    name=choice.expense_name or f"Expense from '{card.title}'",
-                    amount=choice.adds_recurring_expense,
-                    category='LIFESTYLE',
-                    is_essential=False,
-                    inflation_rate=0.04,
-                    started_month=session.current_month
-                )
+        feedback_parts = []
+        if choice.feedback:
+            feedback_parts.append(choice.feedback)
 
-            if choice.cancels_expense_name:
-                expenses = session.expenses.filter(
-                    name=choice.cancels_expense_name,
-                    is_cancelled=False
-                )
-                count = expenses.update(
+        # 2. Handle Recurring Expenses (Add/Remove)
+        if choice.adds_recurring_expense > 0:
+            RecurringExpense.objects.create(
+                session=session,
+                name=choice.expense_name or f"Expense from '{card.title}'",
+                amount=choice.adds_recurring_expense,
+                category='LIFESTYLE',
+                is_essential=False,
+                inflation_rate=0.04,
+                started_month=session.current_month
+            )
+            session.recurring_expenses += choice.adds_recurring_expense
+
+        if choice.cancels_expense_name:
+            expenses = session.expenses.filter(
+                name=choice.cancels_expense_name,
+                is_cancelled=False
+            )
+            # The row lock keeps this set stable, so the amounts read here are
+            # exactly the rows updated below; no UPDATE when nothing matches.
+            cancelled = list(expenses.values_list('amount', 'category'))
+            if cancelled:
+                expenses.update(
                     is_cancelled=True,
                     cancelled_month=session.current_month
                 )
-                if count > 0:
-                    feedback_parts.append(f" (Cancelled {count} subscription(s)!)")
-
-            # 3. Handle Market Events
-            if card.market_event and card.market_event.is_active:
-                event = card.market_event
-                impacts = event.sector_impacts
-
-                market_changes = []
-                if session.market_prices:
-                    for sector, multiplier in impacts.items():
-                        if sector in session.market_prices:
-                            old_price = session.market_prices[sector]
-                            new_price = int(old_price * multiplier)
-                            session.market_prices[sector] = new_price
-
-                            trend_impact = 3 if multiplier > 1 else -3
-                            session.market_trends[sector] = trend_impact
-
-                            pct = int((multiplier - 1) * 100)
-                            direction = "surged" if pct > 0 else "crashed"
-                            market_changes.append(f"{sector.title()} {direction} {abs(pct)}%")
-
-                if market_changes:
-                    feedback_parts.append(f" 📉 MARKET NEWS: {', '.join(market_changes)}!")
-
-            # 4. Log Choice
-            PlayerChoice.objects.create(session=session, card=card, choice=choice)
-
-            # 5. Advance Month Check
-            CONFIG = GameEngineConfig.CONFIG
-            choices_count = PlayerChoice.objects.filter(session=session).count()
-            new_month = (choices_count // CONFIG['CARDS_PER_MONTH']) + 1
-
-            if new_month > session.current_month:
-                result = GameEngine.advance_month(session)
-
-                feedback_parts.append(result['report'])
-
-                if result['game_over']:
-                    GameEngine._finalize_game(session, result['game_over_reason'])
-                    return {
-                        'session': session,
-                        'feedback': " ".join(feedback_parts),
-                        'game_over': True,
-                        'game_over_reason': result['game_over_reason'],
-                        'final_persona': GameEngine.generate_persona(session),
-                        'chatbot': result.get('chatbot'),
-                    }
-
+                session.recurring_expenses -= sum(amount for amount, _ in cancelled)
+                session.total_debt_emi -= sum(amount for amount, category in cancelled if category == 'DEBT')
+                feedback_parts.append(f" (Cancelled {len(cancelled)} subscription(s)!)")
+
+        # 3. Handle Market Events
+        event = MarketEvent.get_active(card.market_event_id)
+        if event:
+            market_changes = []
+            prices = session.market_prices
+            trends = session.market_trends
+            if prices:
+                # Trend and headline per sector are precomputed on the cached event
+                for sector, multiplier, trend_impact, headline in event.shocks:
+                    old_price = prices.get(sector)
+                    if old_price is not None:
+                        prices[sector] = int(old_price * multiplier)
+                        trends[sector] = trend_impact
+                        market_changes.append(headline)
+
+            if market_changes:
+                feedback_parts.append(f" 📉 MARKET NEWS: {', '.join(market_changes)}!")
+
+        # 4. Log Choice
+        PlayerChoice.objects.create(session=session, card=card, choice=choice)
+        session.choice_count += 1
+        # Market JSON is only rewritten when an event actually moved prices
+        session.save_dirty()
+
+        # 5. Advance Month Check
+        new_month = (session.choice_count // _CARDS_PER_MONTH) + 1
+
+        chatbot = None
+        if new_month > session.current_month:
+            result = GameEngine.advance_month(session)
+
+            feedback_parts.append(result['report'])
+            chatbot = result.get('chatbot')
+            # advance_month already checked the state it leaves behind
+            game_over, reason = result['game_over'], result['game_over_reason']
+        else:
             # 6. Check Game Over (Immediate)
             game_over, reason = GameService._check_game_over(session)
-            if game_over:
-                GameEngine._finalize_game(session, reason)
-
-            return {
-                'session': session,
-                'feedback': " ".join(feedback_parts),
-                'game_over': game_over,
-                'game_over_reason': reason,
-                'final_persona': GameEngine.generate_persona(session) if game_over else None,
-                'chatbot': result.get('chatbot') if 'result' in locals() else None,
-            }
+
+        # Finalizing computes the persona for history; reuse it
+        final_persona = GameEngine._finalize_game(session, reason) if game_over else None
+
+        return {
+            'session': session,
+            'feedback': " ".join(feedback_parts),
+            'game_over': game_over,
+            'game_over_reason': reason,
+            'final_persona': final_persona,
+            'chatbot': chatbot,
+        }
 
     @staticmethod
-    def process_skip(session, card):
+    @transaction.atomic
+    def process_skip(session_id, card, user):
         """
         Handle skipping a card.
         Variable penalties based on importance.
+        Takes the id: the locked fetch here is the only session load on this path.
         """
         from . import GameEngine
 
+        # Re-check is_active under the lock; a skip racing game over must not replay
+        session = GameSession.objects.select_related(*_SESSION_RELATED).select_for_update(
+            of=('self',)
+        ).get(pk=session_id, is_active=True)
+        GameService.validate_ownership(user, session)
+
         happiness_loss = 5
         credit_loss = 5
 
@@ -454,12 +572,13 @@ class GameService:
         session.credit_score = max(300, session.credit_score - credit_loss)
 
         PlayerChoice.objects.create(session=session, card=card, choice=None)
+        session.choice_count += 1
 
         game_over, reason = GameService._check_game_over(session)
         if game_over:
             GameEngine._finalize_game(session, reason)
         else:
-            session.save()
+            session.save_dirty()
 
         return {
             'message': f"Skipped! Penalty: -{happiness_loss} Happiness, -{credit_loss} Credit Score.",
@@ -470,6 +589,7 @@ class GameService:
 
     # ================= ECONOMICS & MONTH ADVANCEMENT =================
     @staticmethod
+    @transaction.atomic
     def advance_month(session):
         """
         The Master Time Step Function.
@@ -479,7 +599,6 @@ class GameService:
         - Checks game over
         """
         from . import GameEngine
-        CONFIG = GameEngineConfig.CONFIG
 
         # 1. Advance Time
         session.current_month += 1
@@ -490,24 +609,27 @@ class GameService:
         total_income = 0
         income_report_lines = []
 
-        income_sources = IncomeSource.objects.filter(session=session)
+        # Only the two columns the payout needs; no model instances
+        income_sources = list(
+            IncomeSource.objects.filter(session=session).values_list('source_type', 'amount_base')
+        )
 
-        for source in income_sources:
-            amount = source.amount_base
+        for source_type, amount_base in income_sources:
+            amount = amount_base
 
-            if source.source_type == IncomeSource.SourceType.FREELANCE:
+            if source_type == IncomeSource.SourceType.FREELANCE:
                 chance = random.random()
                 if chance < 0.3:
                     amount = 0
                     income_report_lines.append("⚠️ No Freelance gig this month.")
                 else:
-                    amount = int(source.amount_base * random.uniform(0.8, 1.2))
+                    amount = int(amount_base * random.uniform(0.8, 1.2))
 
             if amount > 0:
                 total_income += amount
-                income_report_lines.append(f"+₹{amount} from {source.get_source_type_display()}")
+                income_report_lines.append(f"+₹{amount} from {_SOURCE_TYPE_LABELS.get(source_type, source_type)}")
 
-        if not income_sources.exists():
+        if not income_sources:
             total_income = session.monthly_salary  # Use session's salary instead of static config
             income_report_lines.append(f"+₹{total_income} Salary credited.")
 
@@ -528,24 +650,26 @@ class GameService:
                 report_lines.append("⚠️ DATA BREACH! Your loan app leaked your contacts. Harassment calls caused stress (-15 Happiness).")
 
         # 3. Recurring Expenses & Inflation
-        active_expenses = session.expenses.filter(is_cancelled=False)
-        total_monthly_drain = 0
+        # session.recurring_expenses is kept current as bills are added or cancelled
         bill_report_lines = []
 
-        apply_inflation = (session.current_month > 1) and (session.current_month % 12 == 1)
-
-        for expense in active_expenses:
-            if apply_inflation and expense.inflation_rate > 0:
-                old_amount = expense.amount
-                new_amount = int(old_amount * (1 + expense.inflation_rate))
-                expense.amount = new_amount
-                expense.save()
-                bill_report_lines.append(f"📈 {expense.name} rose to ₹{new_amount} (+{(expense.inflation_rate * 100):.0f}%)")
-
-            total_monthly_drain += expense.amount
+        if session.current_month in _INFLATION_MONTHS:
+            inflating = session.expenses.filter(is_cancelled=False, inflation_rate__gt=0)
+            # Read the rows for the report, then inflate them all in one UPDATE.
+            # Amounts are positive, so floor matches the int() used here.
+            for name, amount, rate, category in inflating.values_list('name', 'amount', 'inflation_rate', 'category'):
+                new_amount = int(amount * (1 + rate))
+                session.recurring_expenses += new_amount - amount
+                if category == 'DEBT':
+                    session.total_debt_emi += new_amount - amount
+                bill_report_lines.append(f"📈 {name} rose to ₹{new_amount} (+{(rate * 100):.0f}%)")
+            if bill_report_lines:
+                inflating.update(
+                    amount=Cast(Floor(F('amount') * (1 + F('inflation_rate'))), IntegerField())
+                )
 
+        total_monthly_drain = session.recurring_expenses
         session.wealth -= total_monthly_drain
-        session.recurring_expenses = total_monthly_drain
 
         report_lines.append(f"-₹{total_monthly_drain} Total Bills Paid.")
         if bill_report_lines:
@@ -560,7 +684,7 @@ class GameService:
         updated_ipos = []
         for ipo in session.active_ipos:
             if ipo['status'] == 'APPLIED' and ipo['month'] < session.current_month:
-                ipo_details = next((v for k, v in CONFIG['IPO_SCHEDULE'].items() if v['name'] == ipo['name']), None)
+                _, ipo_details = _IPO_BY_NAME.get(ipo['name'], (None, None))
 
                 listing_gain_pct = 0
                 if ipo_details:
@@ -599,11 +723,11 @@ class GameService:
         session.active_ipos = updated_ipos
 
         # 5. Natural Stat Decay
-        if session.wealth < 10000:
-            session.happiness -= 2
-            report_lines.append("📉 Financial stress is affecting your happiness (-2).")
+        if session.wealth < _STRESS_WEALTH:
+            session.happiness -= _STRESS_HAPPINESS_LOSS
+            report_lines.append(f"📉 Financial stress is affecting your happiness (-{_STRESS_HAPPINESS_LOSS}).")
 
-        if session.happiness > 90:
+        if session.happiness > _HAPPINESS_DRIFT_ABOVE:
             session.happiness -= 1
 
         # 6. Check Game Over
@@ -618,7 +742,8 @@ class GameService:
                 session.happiness = min(100, session.happiness + 5)
                 report_lines.append("(+5 Happiness Bonus)")
 
-        session.save()
+        # The caller holds the row lock; write only what this month changed
+        session.save_dirty()
 
         if game_over:
             report_lines.append(f"GAME OVER: {reason}")
@@ -643,8 +768,11 @@ class GameService:
 
     # ================= LOAN LOGIC =================
     @staticmethod
+    @transaction.atomic
     def process_loan(session, loan_type):
         """Smart Loan System. Limit based on credit score."""
+        # Lock the session row to prevent race conditions
+        session = GameSession.objects.select_for_update().get(id=session.id)
         CONFIG = GameEngineConfig.CONFIG
         GameService._refresh_level(session)  # Updates session.current_level if changed
 
@@ -680,6 +808,8 @@ class GameService:
                 inflation_rate=0.0,
                 started_month=session.current_month
             )
+            session.recurring_expenses += 500
+            session.total_debt_emi += 500
             msg = f"Loan approved: ₹{amount}. Credit score dropped. Monthly interest added."
         
         elif loan_type == 'BANK':
@@ -702,27 +832,24 @@ class GameService:
                 inflation_rate=0.0,
                 started_month=session.current_month
             )
+            session.recurring_expenses += emi
+            session.total_debt_emi += emi
             msg = f"Bank Loan approved: ₹{amount}. EMI ₹{emi}/mo started."
 
         else:
             return {'error': "Invalid loan type"}
 
-        session.save()
+        session.save_dirty()
         return {'session': session, 'message': msg}
 
     # ================= UTILITIES =================
-    @staticmethod
-    def _clamp(val, min_val, max_val):
-        return max(min_val, min(max_val, val))
-
     @staticmethod
     def _check_game_over(session):
-        CONFIG = GameEngineConfig.CONFIG
         if session.wealth <= 0:
             return True, 'BANKRUPTCY'
-        if session.happiness <= CONFIG['MIN_HAPPINESS']:
+        if session.happiness <= _MIN_HAPPINESS:
             return True, 'BURNOUT'
-        if session.current_month > CONFIG['GAME_DURATION_MONTHS']:
+        if session.current_month > _GAME_DURATION_MONTHS:
             return True, 'COMPLETED'
         return False, None
 
@@ -731,22 +858,15 @@ class GameService:
         entry = entry.strip()
         if not entry:
             return
-        if session.gameplay_log:
-            session.gameplay_log = f"{session.gameplay_log}\n{entry}"
-        else:
-            session.gameplay_log = entry
+        GameplayLogEntry.objects.create(session=session, month=session.current_month, text=entry)
 
     @staticmethod
     def _calculate_level(session):
-        CONFIG = GameEngineConfig.CONFIG
-        level = 1
-        for threshold in CONFIG['LEVEL_THRESHOLDS']:
-            if (
-                session.current_month >= threshold['min_month']
-                or session.financial_literacy >= threshold['min_literacy']
-            ):
-                level = threshold['level']
-        return level
+        tier = max(
+            bisect_right(_LEVEL_MIN_MONTHS, session.current_month),
+            bisect_right(_LEVEL_MIN_LITERACY, session.financial_literacy),
+        )
+        return _LEVEL_THRESHOLDS[tier - 1]['level'] if tier else 1
 
     @staticmethod
     def _refresh_level(session):
@@ -754,13 +874,11 @@ class GameService:
         Recalculate level and update session.
         Returns: (bool, str) -> (Did Level Up?, Level Description)
         """
-        CONFIG = GameEngineConfig.CONFIG
         next_level = GameService._calculate_level(session)
         
         if session.current_level < next_level:
             session.current_level = next_level
-            level_info = next((L for L in CONFIG['LEVEL_THRESHOLDS'] if L['level'] == next_level), None)
-            desc = level_info['desc'] if level_info else f"Level {next_level}"
+            desc = _LEVEL_DESCS.get(next_level, f"Level {next_level}")
             return True, desc
         
         return False, None
@@ -2,11 +2,27 @@
 import random
 import logging
 
-from ..models import RecurringExpense, StockHistory, FuturesContract, GameSession
+from django.db import transaction
+
+from ..models import (
+    RecurringExpense, StockHistory, FuturesContract, GameSession, PortfolioItem, TransactionLedger,
+)
 from .config import GameEngineConfig
 
 logger = logging.getLogger(__name__)
 
+# IPO name -> (opening month, details), built once from the schedule.
+_IPO_BY_NAME = {
+    details['name']: (month, details)
+    for month, details in GameEngineConfig.CONFIG['IPO_SCHEDULE'].items()
+}
+
+# (price key, volatility, display name) per mutual fund, for the monthly NAV walk.
+_MF_NAV_PARAMS = tuple(
+    (f"MF_{mf_key}", mf_data['volatility'], mf_data['name'])
+    for mf_key, mf_data in GameEngineConfig.CONFIG['MUTUAL_FUNDS'].items()
+)
+
 
 class MarketService:
     """Stock trading, mutual funds, futures, and IPO operations."""
@@ -17,87 +33,93 @@ class MarketService:
         Apply momentum/trends to prices each month.
         Returns list of significant changes for the news feed.
         """
-        CONFIG = GameEngineConfig.CONFIG
-        if not session.market_prices:
+        prices = session.market_prices  # mutated in place
+        if not prices:
             return []
 
         changes = []
         new_month = session.current_month
 
-        histories = StockHistory.objects.filter(session=session, month=new_month)
+        # Only the two columns needed; no model instances. order_by() drops the
+        # Meta ordering on 'session', which would JOIN game sessions to sort.
+        histories = StockHistory.objects.filter(
+            session=session, month=new_month
+        ).order_by().values_list('sector', 'price')
 
-        for record in histories:
-            old_price = session.market_prices.get(record.sector, 0)
-            new_price = record.price
+        for sector, new_price in histories:
+            old_price = prices.get(sector, 0)
 
-            session.market_prices[record.sector] = new_price
+            prices[sector] = new_price
 
             if old_price > 0:
                 pct_change = ((new_price - old_price) / old_price) * 100
                 if abs(pct_change) > 5:
                     direction = "surged" if pct_change > 0 else "tanked"
-                    changes.append(f"{record.sector.title()} {direction} {abs(pct_change):.1f}%")
+                    changes.append(f"{sector.title()} {direction} {abs(pct_change):.1f}%")
 
         # Update Mutual Fund NAVs
-        for mf_key, mf_data in CONFIG['MUTUAL_FUNDS'].items():
-            key = f"MF_{mf_key}"
-            old_nav = session.market_prices.get(key, 100)
+        for key, vol, fund_name in _MF_NAV_PARAMS:
+            old_nav = prices.get(key, 100)
 
-            vol = mf_data['volatility']
             change_pct = random.gauss(0.008, vol)
 
             new_nav = old_nav * (1 + change_pct)
-            session.market_prices[key] = max(10, new_nav)
+            prices[key] = max(10, new_nav)
 
             if change_pct < -0.05:
-                changes.append(f"{mf_data['name']} dropped {abs(change_pct * 100):.1f}%")
+                changes.append(f"{fund_name} dropped {abs(change_pct * 100):.1f}%")
 
         return changes
 
     # ================= STOCK TRADING =================
     @staticmethod
+    @transaction.atomic
     def buy_stock(session, sector, amount):
         """Buy stocks in a specific sector."""
-        from django.db import transaction
         from .game_service import GameService
         CONFIG = GameEngineConfig.CONFIG
-        
-        with transaction.atomic():
-            # Lock the session row to prevent race conditions
-            session = GameSession.objects.select_for_update().get(id=session.id)
-
-            GameService._refresh_level(session)
-            if session.current_level < CONFIG['LEVEL_UNLOCKS']['investing']:
-                return {'error': "Investing unlocks at Level 2."}
-            if (
-                session.current_level < CONFIG['LEVEL_UNLOCKS']['diversification']
-                and session.portfolio
-                and any(units > 0 for s, units in session.portfolio.items() if s != sector)
-            ):
-                return {'error': "Diversification unlocks at Level 3. Stick to one sector for now."}
-            if sector not in CONFIG['STOCK_SECTORS']:
-                return {'error': "Invalid sector."}
-
-            if amount <= 0:
-                return {'error': "Amount must be positive."}
-
-            if session.wealth < amount:
-                return {'error': "Insufficient funds."}
-
-            current_price = session.market_prices.get(sector, 100)
-            units = amount / current_price
-
-            session.wealth -= amount
-            session.portfolio[sector] = session.portfolio.get(sector, 0) + units
-
-            session.purchase_history.append({
-                "sector": sector,
-                "units": units,
-                "price": current_price,
-                "month": session.current_month
-            })
-
-            session.save()
+
+        # Lock the session row to prevent race conditions
+        session = GameSession.objects.select_for_update().get(id=session.id)
+
+        GameService._refresh_level(session)
+        if session.current_level < CONFIG['LEVEL_UNLOCKS']['investing']:
+            return {'error': "Investing unlocks at Level 2."}
+        if (
+            session.current_level < CONFIG['LEVEL_UNLOCKS']['diversification']
+            and session.portfolio_items.filter(units__gt=0).exclude(sector=sector).exists()
+        ):
+            return {'error': "Diversification unlocks at Level 3. Stick to one sector for now."}
+        if sector not in CONFIG['STOCK_SECTORS']:
+            return {'error': "Invalid sector."}
+
+        if amount <= 0:
+            return {'error': "Amount must be positive."}
+
+        if session.wealth < amount:
+            return {'error': "Insufficient funds."}
+
+        current_price = session.market_prices.get(sector, 100)
+        units = amount / current_price
+
+        session.wealth -= amount
+        holding, _ = PortfolioItem.objects.get_or_create(session=session, sector=sector)
+        total_units = holding.units + units
+        holding.average_buy_price = (holding.units * holding.average_buy_price + amount) / total_units
+        holding.units = total_units
+        holding.save(update_fields=['units', 'average_buy_price'])
+
+        TransactionLedger.objects.create(
+            session=session,
+            transaction_type=TransactionLedger.TransactionType.BUY,
+            sector=sector,
+            units=units,
+            price_per_unit=current_price,
+            total_amount=amount,
+            month=session.current_month
+        )
+
+        session.save_dirty()
 
         return {
             'session': session,
@@ -105,32 +127,44 @@ class MarketService:
         }
 
     @staticmethod
+    @transaction.atomic
     def sell_stock(session, sector, amount):
         """Sell stocks. `amount` refers to UNITS to sell."""
-        from django.db import transaction
         CONFIG = GameEngineConfig.CONFIG
 
-        with transaction.atomic():
-             # Lock the session row to prevent race conditions
-            session = GameSession.objects.select_for_update().get(id=session.id)
-            if sector not in CONFIG['STOCK_SECTORS']:
-                return {'error': "Invalid sector."}
+        # Lock the session row to prevent race conditions
+        session = GameSession.objects.select_for_update().get(id=session.id)
+        if sector not in CONFIG['STOCK_SECTORS']:
+            return {'error': "Invalid sector."}
 
-            units_to_sell = float(amount)
+        units_to_sell = float(amount)
 
-            if units_to_sell <= 0:
-                return {'error': "Invalid units."}
+        if units_to_sell <= 0:
+            return {'error': "Invalid units."}
 
-            current_owned = session.portfolio.get(sector, 0)
-            if current_owned < units_to_sell:
-                return {'error': f"You only have {current_owned:.2f} units."}
+        current_owned = PortfolioItem.objects.filter(
+            session=session, sector=sector
+        ).values_list('units', flat=True).first() or 0
+        if current_owned < units_to_sell:
+            return {'error': f"You only have {current_owned:.2f} units."}
 
-            current_price = session.market_prices.get(sector, 100)
-            cash_value = units_to_sell * current_price
+        current_price = session.market_prices.get(sector, 100)
+        cash_value = units_to_sell * current_price
 
-            session.wealth += int(cash_value)
-            session.portfolio[sector] = current_owned - units_to_sell
-            session.save()
+        session.wealth += int(cash_value)
+        PortfolioItem.objects.filter(session=session, sector=sector).update(
+            units=current_owned - units_to_sell
+        )
+        TransactionLedger.objects.create(
+            session=session,
+            transaction_type=TransactionLedger.TransactionType.SELL,
+            sector=sector,
+            units=units_to_sell,
+            price_per_unit=current_price,
+            total_amount=cash_value,
+            month=session.current_month
+        )
+        session.save(update_fields=['wealth', 'updated_at'])
 
         return {
             'session': session,
@@ -138,10 +172,13 @@ class MarketService:
         }
 
     @staticmethod
+    @transaction.atomic
     def sell_futures(session, sector, units, duration):
         """Executes a Futures Contract sale."""
         from .game_service import GameService
         CONFIG = GameEngineConfig.CONFIG
+        # Lock the session row to prevent race conditions
+        session = GameSession.objects.select_for_update().get(id=session.id)
 
         GameService._refresh_level(session)
         if session.current_level < CONFIG['LEVEL_UNLOCKS']['mastery']:
@@ -150,7 +187,9 @@ class MarketService:
             return {'error': "Invalid sector"}
 
         current_price = session.market_prices[sector]
-        current_owned = session.portfolio.get(sector, 0)
+        current_owned = PortfolioItem.objects.filter(
+            session=session, sector=sector
+        ).values_list('units', flat=True).first() or 0
 
         if current_owned < units:
             return {'error': f"Insufficient units. You have {current_owned}."}
@@ -162,7 +201,9 @@ class MarketService:
         total_payout = contract_price * units
 
         session.wealth += int(total_payout)
-        session.portfolio[sector] = current_owned - units
+        PortfolioItem.objects.update_or_create(
+            session=session, sector=sector, defaults={'units': current_owned - units}
+        )
 
         FuturesContract.objects.create(
             session=session,
@@ -174,7 +215,7 @@ class MarketService:
             created_month=session.current_month
         )
 
-        session.save()
+        session.save_dirty()
 
         return {
             'message': f"Contract Sold! {units} {sector} units @ ₹{contract_price}/unit. +₹{int(total_payout)}",
@@ -183,10 +224,13 @@ class MarketService:
 
     # ================= MUTUAL FUNDS & IPOs =================
     @staticmethod
+    @transaction.atomic
     def buy_mutual_fund(session, fund_type, amount):
         """Invest in a Mutual Fund."""
         from .game_service import GameService
         CONFIG = GameEngineConfig.CONFIG
+        # Lock the session row to prevent race conditions
+        session = GameSession.objects.select_for_update().get(id=session.id)
 
         GameService._refresh_level(session)
         if session.current_level < CONFIG['LEVEL_UNLOCKS']['investing']:
@@ -212,7 +256,7 @@ class MarketService:
 
         session.mutual_funds[fund_type] = current_data
         session.wealth -= amount
-        session.save()
+        session.save_dirty()
 
         return {
             'session': session,
@@ -220,8 +264,11 @@ class MarketService:
         }
 
     @staticmethod
+    @transaction.atomic
     def sell_mutual_fund(session, fund_type, units):
         """Redeem Mutual Fund units."""
+        # Lock the session row to prevent race conditions
+        session = GameSession.objects.select_for_update().get(id=session.id)
         if fund_type not in session.mutual_funds:
             return {'error': "You don't own this fund."}
 
@@ -235,18 +282,19 @@ class MarketService:
         redemption_value = units * nav
 
         session.wealth += int(redemption_value)
-        current_data['units'] -= units
 
-        original_units = current_data['units'] + units
-        if original_units > 0:
-            current_data['invested'] = current_data['invested'] * (current_data['units'] / original_units)
+        # Cost basis shrinks in proportion to the units kept
+        original_units = current_data['units']
+        new_units = original_units - units
+        current_data['invested'] *= (new_units / original_units) if original_units else 0.0
+        current_data['units'] = new_units
 
-        if current_data['units'] < 0.01:
+        if new_units < 0.01:
             del session.mutual_funds[fund_type]
         else:
             session.mutual_funds[fund_type] = current_data
 
-        session.save()
+        session.save(update_fields=['wealth', 'mutual_funds', 'updated_at'])
 
         return {
             'session': session,
@@ -254,23 +302,19 @@ class MarketService:
         }
 
     @staticmethod
+    @transaction.atomic
     def apply_for_ipo(session, ipo_name, amount):
         """Apply for an IPO."""
         from .game_service import GameService
-        CONFIG = GameEngineConfig.CONFIG
+        # Lock the session row to prevent race conditions
+        session = GameSession.objects.select_for_update().get(id=session.id)
 
         GameService._refresh_level(session)
 
-        ipo_month = None
-        ipo_details = None
-        for m, details in CONFIG['IPO_SCHEDULE'].items():
-            if details['name'] == ipo_name:
-                ipo_month = m
-                ipo_details = details
-                break
-
-        if not ipo_details:
+        ipo_entry = _IPO_BY_NAME.get(ipo_name)
+        if not ipo_entry:
             return {'error': "Invalid IPO."}
+        ipo_month, _ = ipo_entry
 
         if session.current_month > ipo_month:
             return {'error': "IPO Closed."}
@@ -294,7 +338,7 @@ class MarketService:
             "status": "APPLIED",
             "month": session.current_month
         })
-        session.save()
+        session.save_dirty()
 
         return {
             'session': session,
@@ -3,10 +3,17 @@ Persona generation, game-over finalization, and history recording.
 """
 import os
 import logging
+from datetime import timedelta
 
-from ..models import GameHistory, PlayerProfile
+from django.db.models import F, Q, Value, prefetch_related_objects
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from ..models import GameHistory, GameSession, PlayerProfile
 from ..advisor import GROQ_AVAILABLE as GENAI_AVAILABLE
-from .config import GameEngineConfig, REPORT_PROMPT_TEMPLATE
+from .config import (
+    GameEngineConfig, REPORT_PROMPT_STATIC, REPORT_PROMPT_DYNAMIC, FALLBACK_REPORT_TEMPLATE,
+)
 
 # Optional: Google GenAI for final reports
 try:
@@ -20,37 +27,118 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# A report request that holds its generation claim longer than this is taken
+# to have been abandoned, and the next request may generate the report again.
+_REPORT_CLAIM_TIMEOUT = timedelta(minutes=5)
+
+# Shared Gemini client (created on first report)
+_genai_client = None
+
+
+def _get_genai_client():
+    """Get or create the shared Gemini client."""
+    global _genai_client
+    if _genai_client is None:
+        _genai_client = genai.Client(api_key=os.environ.get('GEMINI_API_KEY'))
+    return _genai_client
+
+
+def _persona_for(rich, joyful, gloomy, broke, expert, skilled):
+    """The persona ladder, evaluated once per flag combination."""
+    if rich and joyful:
+        return "The Financial Guru", "Mastered wealth AND happiness."
+    if rich and gloomy:
+        return "The Miser", "Rich but miserable."
+    if broke and joyful:
+        return "The Happy-Go-Lucky", "Broke but smiling."
+    if expert:
+        return "The Warren Buffett", "Strategic genius."
+    if skilled:
+        return "The Balanced Spender", "Good balance."
+    return "The FOMO Victim", "Driven by trends."
+
+
+# (persona, description) indexed by the six threshold flags packed into bits.
+_PERSONA_TABLE = tuple(
+    _persona_for(*(bool(bits >> i & 1) for i in range(6)))
+    for bits in range(64)
+)
+
 
 class ReportService:
     """End-of-game persona, final report, and history persistence."""
 
     @staticmethod
     def _finalize_game(session, reason):
-        """Mark session inactive, generate report, and persist history."""
+        """Mark session inactive and persist history. Returns the persona.
+
+        The report is left empty; the final-report view writes it on first request.
+        """
         from . import GameEngine
 
+        GameEngine._discard_prefetched_ai_card(session)
+        # History values the holdings; load them once.
+        prefetch_related_objects([session], 'portfolio_items')
         session.is_active = False
-        if not session.final_report:
-            session.final_report = ReportService._generate_final_report(session, reason)
-        session.save()
-        ReportService._save_history(session, reason)
+        session.save_dirty()
+        return ReportService._save_history(session, reason)
 
     @staticmethod
-    def _generate_final_report(session, reason):
-        """Build an end-of-game report, optionally using Gemini."""
-        portfolio_value = 0
-        portfolio_lines = []
-        if session.portfolio and session.market_prices:
-            for sector, units in session.portfolio.items():
-                price = session.market_prices.get(sector, 100)
-                value = int(units * price)
-                portfolio_value += value
-                if units:
-                    portfolio_lines.append(f"{sector.title()}: {units:.2f} units @ ₹{price} (₹{value})")
-        portfolio_breakdown = "; ".join(portfolio_lines) if portfolio_lines else "No active holdings."
-        gameplay_log = session.gameplay_log or "No gameplay log recorded."
-
-        prompt = REPORT_PROMPT_TEMPLATE.format(
+    def _llm_report_enabled():
+        return bool(GENAI_AVAILABLE and genai and os.environ.get('GEMINI_API_KEY'))
+
+    @staticmethod
+    def stream_final_report(session):
+        """Stream a finished session's report, persisting it once fully generated."""
+        if session.final_report:
+            yield session.final_report
+            return
+
+        reason = ReportService._end_reason(session)
+        # Value and breakdown both read the holdings; load them once.
+        prefetch_related_objects([session], 'portfolio_items')
+
+        # Claim generation with a conditional UPDATE so concurrent first requests
+        # don't each call Gemini; a claim left by an abandoned stream expires.
+        now = timezone.now()
+        claimed = GameSession.objects.filter(
+            Q(report_started_at__isnull=True) | Q(report_started_at__lt=now - _REPORT_CLAIM_TIMEOUT),
+            pk=session.pk, final_report='',
+        ).update(report_started_at=now)
+        if not claimed:
+            # Someone else is generating it (or just finished); don't persist this copy
+            stored = GameSession.objects.filter(pk=session.pk).values_list('final_report', flat=True).first()
+            yield stored or ReportService._fallback_report(session, reason)
+            return
+
+        chunks = []
+        for chunk in ReportService._stream_final_report(session, reason):
+            chunks.append(chunk)
+            yield chunk
+        # Only reached if the client read the whole stream.
+        session.final_report = "".join(chunks)
+        GameSession.objects.filter(pk=session.pk, final_report='').update(
+            final_report=session.final_report, updated_at=timezone.now()
+        )
+
+    @staticmethod
+    def _end_reason(session):
+        """The end reason recorded at finalize time; recomputed for games finished before it was linked."""
+        reason = GameHistory.objects.filter(session=session).values_list('end_reason', flat=True).first()
+        if reason:
+            return reason
+        from . import GameEngine
+        _, reason = GameEngine._check_game_over(session)
+        return reason or 'COMPLETED'
+
+    @staticmethod
+    def _stream_final_report(session, reason):
+        """Yield the report as Gemini produces it; the fallback is one chunk."""
+        portfolio_value = ReportService._portfolio_value(session)
+        portfolio_breakdown = ReportService._portfolio_breakdown(session)
+        gameplay_log = "\n".join(session.log_entries.values_list('text', flat=True)) or "No gameplay log recorded."
+
+        prompt = REPORT_PROMPT_STATIC + REPORT_PROMPT_DYNAMIC.format(
             reason=reason,
             current_month=session.current_month,
             wealth=session.wealth,
@@ -63,51 +151,53 @@ class ReportService:
             gameplay_log=gameplay_log,
         )
 
-        if GENAI_AVAILABLE and genai and os.environ.get('GEMINI_API_KEY'):
+        if ReportService._llm_report_enabled():
+            streamed = False
             try:
-                client = genai.Client(api_key=os.environ.get('GEMINI_API_KEY'))
-                response = client.models.generate_content(
+                client = _get_genai_client()
+                for chunk in client.models.generate_content_stream(
                     model='gemini-1.5-flash',
                     contents=prompt
-                )
-                if response and getattr(response, 'text', None):
-                    return response.text.strip()
+                ):
+                    text = getattr(chunk, 'text', None)
+                    if text:
+                        streamed = True
+                        yield text
             except Exception as e:
                 logger.error("GenAI report failed: %s", e)
-                pass
-
-        return (
-            "## Summary\n"
-            f"- Outcome: **{reason}** after month **{session.current_month}**.\n"
-            f"- Final cash: **₹{session.wealth}**. Portfolio value: **₹{portfolio_value}**.\n"
-            f"- Happiness: **{session.happiness}**. Credit score: **{session.credit_score}**.\n\n"
-            "## Highlights\n"
-            f"- Portfolio: {portfolio_breakdown}\n"
-            f"- Recurring expenses: ₹{session.recurring_expenses}\n\n"
-            "## Risks\n"
-            "- Watch cash flow relative to recurring bills.\n"
-            "- Keep credit score healthy by avoiding high-interest debt.\n\n"
-            "## Recommendations\n"
-            "- Build a 3–6 month emergency fund.\n"
-            "- Automate savings with a monthly SIP.\n"
-            "- Review recurring expenses and cancel low-value subscriptions.\n"
+
+            if streamed:
+                return
+
+        yield ReportService._fallback_report(session, reason)
+
+    @staticmethod
+    def _fallback_report(session, reason):
+        """Offline Markdown report built from the final session stats."""
+        return FALLBACK_REPORT_TEMPLATE.format(
+            reason=reason,
+            current_month=session.current_month,
+            wealth=session.wealth,
+            portfolio_value=ReportService._portfolio_value(session),
+            happiness=session.happiness,
+            credit_score=session.credit_score,
+            portfolio_breakdown=ReportService._portfolio_breakdown(session),
+            recurring_expenses=session.recurring_expenses,
         )
 
     @staticmethod
     def _save_history(session, reason):
-        """Persist a GameHistory record and update PlayerProfile stats."""
+        """Persist a GameHistory record and update PlayerProfile stats. Returns the persona."""
         from . import GameEngine
 
         persona_data = GameEngine.generate_persona(session)
-        if session.user:
-            portfolio_value = 0
-            if session.portfolio and session.market_prices:
-                for sector, units in session.portfolio.items():
-                    price = session.market_prices.get(sector, 100)
-                    portfolio_value += int(units * price)
+        user_id = session.user_id  # ids only; the user row is never needed
+        if user_id:
+            portfolio_value = ReportService._portfolio_value(session)
 
             GameHistory.objects.create(
-                user=session.user,
+                user_id=user_id,
+                session=session,
                 final_wealth=session.wealth,
                 final_happiness=session.happiness,
                 final_credit_score=session.credit_score,
@@ -116,14 +206,40 @@ class ReportService:
                 end_reason=reason,
                 months_played=session.current_month
             )
-            profile, _ = PlayerProfile.objects.get_or_create(user=session.user)
-            profile.total_games += 1
-            profile.highest_wealth = max(profile.highest_wealth, session.wealth + portfolio_value)
-            profile.highest_score = max(profile.highest_score, session.financial_literacy)
-            profile.highest_credit_score = max(profile.highest_credit_score, session.credit_score)
-            profile.highest_happiness = max(profile.highest_happiness, session.happiness)
-            profile.highest_stock_profit = max(profile.highest_stock_profit, portfolio_value)
-            profile.save()
+            # Single UPDATE with DB-side max(): no read-modify-write race
+            # when two of the player's games finish at once.
+            stats = dict(
+                total_games=F('total_games') + 1,
+                highest_wealth=Greatest('highest_wealth', Value(session.wealth + portfolio_value)),
+                highest_score=Greatest('highest_score', Value(session.financial_literacy)),
+                highest_credit_score=Greatest('highest_credit_score', Value(session.credit_score)),
+                highest_happiness=Greatest('highest_happiness', Value(session.happiness)),
+                highest_stock_profit=Greatest('highest_stock_profit', Value(portfolio_value)),
+            )
+            if not PlayerProfile.objects.filter(user_id=user_id).update(**stats):
+                # First finished game: create the profile, then apply the same update.
+                PlayerProfile.objects.get_or_create(user_id=user_id)
+                PlayerProfile.objects.filter(user_id=user_id).update(**stats)
+        return persona_data
+
+    @staticmethod
+    def _portfolio_value(session):
+        """Mark-to-market value of stock holdings (unknown prices count as ₹100)."""
+        prices = session.market_prices
+        if not prices:
+            return 0
+        return sum(int(units * prices.get(sector, 100)) for sector, units in session.get_holdings().items())
+
+    @staticmethod
+    def _portfolio_breakdown(session):
+        """One line per held sector for the report, or a 'no holdings' note."""
+        prices = session.market_prices or {}
+        lines = []
+        for sector, units in session.get_holdings().items():
+            if units:
+                price = prices.get(sector, 100)
+                lines.append(f"{sector.title()}: {units:.2f} units @ ₹{price} (₹{int(units * price)})")
+        return "; ".join(lines) if lines else "No active holdings."
 
     @staticmethod
     def generate_persona(session):
@@ -132,18 +248,14 @@ class ReportService:
         h = session.happiness
         s = session.financial_literacy
 
-        if w > 100000 and h > 80:
-            p, d = "The Financial Guru", "Mastered wealth AND happiness."
-        elif w > 100000 and h < 40:
-            p, d = "The Miser", "Rich but miserable."
-        elif w < 10000 and h > 80:
-            p, d = "The Happy-Go-Lucky", "Broke but smiling."
-        elif s >= 80:
-            p, d = "The Warren Buffett", "Strategic genius."
-        elif s >= 50:
-            p, d = "The Balanced Spender", "Good balance."
-        else:
-            p, d = "The FOMO Victim", "Driven by trends."
+        p, d = _PERSONA_TABLE[
+            (w > 100000)
+            | (h > 80) << 1
+            | (h < 40) << 2
+            | (w < 10000) << 3
+            | (s >= 80) << 4
+            | (s >= 50) << 5
+        ]
 
         return {
             'persona': p,
@@ -0,0 +1,45 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from game_engine.models import GameSession, IncomeSource, RecurringExpense
+from game_engine.services import GameEngine
+
+
+class AdvanceMonthTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester')
+
+    def make_session(self, wealth, expense):
+        session = GameSession.objects.create(
+            user=self.user, wealth=wealth, happiness=50, current_month=5, recurring_expenses=expense,
+            market_prices={"tech": 100},
+        )
+        IncomeSource.objects.create(
+            session=session, source_type='SALARY', amount_base=25000, frequency='MONTHLY'
+        )
+        RecurringExpense.objects.create(session=session, name='Rent', amount=expense, started_month=1)
+        return GameSession.objects.get(pk=session.pk)
+
+    def test_month_end_write_matches_full_save(self):
+        session = self.make_session(wealth=50000, expense=10000)
+
+        result = GameEngine.advance_month(session)
+
+        self.assertFalse(result['game_over'])
+        self.assertNotIn('LEVEL UP', result['report'])
+        stored = GameSession.objects.get(pk=session.pk)
+        self.assertEqual((stored.wealth, stored.current_month), (65000, 6))
+        self.assertEqual((stored.current_level, stored.happiness), (2, 50))
+        # Everything save() would have written is in the row
+        for field in GameSession._meta.concrete_fields:
+            if field.name != 'updated_at':
+                self.assertEqual(getattr(stored, field.attname), getattr(session, field.attname), field.name)
+
+    def test_game_over_month_still_refreshes_level(self):
+        session = self.make_session(wealth=1000, expense=40000)
+
+        result = GameEngine.advance_month(session)
+
+        self.assertEqual(result['game_over_reason'], 'BANKRUPTCY')
+        stored = GameSession.objects.get(pk=session.pk)
+        self.assertEqual((stored.wealth, stored.current_month, stored.current_level), (-14000, 6, 2))
@@ -0,0 +1,57 @@
+import random
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from game_engine.models import Choice, GameSession, PlayerChoice, ScenarioCard
+from game_engine.services import GameEngine
+from game_engine.services.game_service import GameService
+
+
+class CardSelectionTests(TestCase):
+    def setUp(self):
+        random.seed(7)  # SQLite's RAND() is Python's random.random
+        # Keep get_next_card on the hand-written deck; no background AI jobs
+        patcher = mock.patch.object(GameService, '_prefetch_ai_card')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        user = User.objects.create_user(username='tester')
+        self.session = GameSession.objects.create(
+            user=user, wealth=50000, current_month=3, financial_literacy=0
+        )
+
+    def make_card(self, title, difficulty=1):
+        card = ScenarioCard.objects.create(
+            title=title, description=title, category='NEEDS', difficulty=difficulty
+        )
+        Choice.objects.create(card=card, text='OK')
+        return card
+
+    def test_shown_cards_are_not_drawn_again(self):
+        shown = self.make_card('Shown')
+        fresh = self.make_card('Fresh')
+        PlayerChoice.objects.create(session=self.session, card=shown, choice=shown.choices.first())
+
+        drawn = {GameEngine.get_next_card(self.session) for _ in range(20)}
+
+        self.assertEqual(drawn, {fresh})
+
+    def test_draw_follows_difficulty_weights(self):
+        easy = self.make_card('Easy', difficulty=1)
+        self.make_card('Hard', difficulty=3)
+        candidates = ScenarioCard.objects.all()
+
+        draws = [GameEngine._pick_random_card(self.session, candidates) for _ in range(1000)]
+
+        # Literacy 0 weights difficulty 1 at 4.0 and difficulty 3 at 1.0: 80% easy
+        share = sum(card == easy for card in draws) / len(draws)
+        self.assertAlmostEqual(share, 0.8, delta=0.05)
+
+    def test_prefetched_ai_card_is_served_once(self):
+        ai_card = self.make_card('AI')
+        cache.set(f'ai_card:{self.session.id}', ai_card.id)
+
+        self.assertEqual(GameService._take_prefetched_ai_card(self.session), ai_card)
+        self.assertIsNone(GameService._take_prefetched_ai_card(self.session))
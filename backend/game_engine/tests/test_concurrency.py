@@ -15,9 +15,6 @@ class ConcurrencyTests(TransactionTestCase):
             current_level=5, # Unlock investing
             market_prices={"tech": 100}
         )
-        # Ensure portfolio is initialized
-        self.session.portfolio = {"tech": 0}
-        self.session.save()
 
     def test_concurrent_buying(self):
         """
@@ -68,5 +65,6 @@ class ConcurrencyTests(TransactionTestCase):
         
         # Verify Portfolio
         expected_units = 10 * success_count
-        self.assertEqual(self.session.portfolio.get('tech'), expected_units,
-                        f"Portfolio mismatch! Expected {expected_units}, Got {self.session.portfolio.get('tech')}")
+        held = self.session.get_holdings().get('tech', 0)
+        self.assertEqual(held, expected_units,
+                        f"Portfolio mismatch! Expected {expected_units}, Got {held}")
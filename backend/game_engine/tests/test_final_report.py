@@ -0,0 +1,71 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from game_engine.models import GameSession
+from game_engine.services import GameEngine
+from game_engine.services.report_service import ReportService
+
+
+class FinalReportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester')
+        self.session = GameSession.objects.create(user=self.user, wealth=0, current_month=7)
+
+    def test_finalize_leaves_report_for_first_stream(self):
+        GameEngine._finalize_game(self.session, 'BANKRUPTCY')
+        self.session.refresh_from_db()
+        self.assertFalse(self.session.is_active)
+        self.assertEqual(self.session.final_report, '')
+
+        report = ''.join(GameEngine.stream_final_report(self.session))
+        self.assertIn('**BANKRUPTCY** after month **7**', report)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.final_report, report)
+
+    def test_report_uses_reason_recorded_at_finalize(self):
+        # Ended by finishing the last month, though cash is now also gone
+        GameEngine._finalize_game(self.session, 'COMPLETED')
+
+        report = ''.join(GameEngine.stream_final_report(GameSession.objects.get(pk=self.session.pk)))
+        self.assertIn('**COMPLETED**', report)
+
+    def test_concurrent_first_requests_generate_once(self):
+        GameEngine._finalize_game(self.session, 'BANKRUPTCY')
+        generate = mock.Mock(side_effect=lambda session, reason: iter(['## Part 1', ' Part 2']))
+
+        with mock.patch.object(ReportService, '_stream_final_report', generate):
+            first = GameEngine.stream_final_report(GameSession.objects.get(pk=self.session.pk))
+            self.assertEqual(next(first), '## Part 1')  # claimed, mid-stream
+            second = ''.join(GameEngine.stream_final_report(GameSession.objects.get(pk=self.session.pk)))
+            self.assertEqual(''.join(first), ' Part 2')
+
+        self.assertEqual(generate.call_count, 1)
+        self.assertIn('**BANKRUPTCY**', second)  # offline copy, not persisted
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.final_report, '## Part 1 Part 2')
+
+    def stream(self, session):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get(reverse('final-report', args=[session.pk]))
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_view_streams_and_stores_missing_report(self):
+        GameEngine._finalize_game(self.session, 'BANKRUPTCY')
+
+        body = self.stream(self.session)
+        self.assertIn('**BANKRUPTCY** after month **7**', body)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.final_report, body)
+
+    def test_view_serves_stored_report(self):
+        self.session.is_active = False
+        self.session.final_report = '## Stored report'
+        self.session.save()
+
+        self.assertEqual(self.stream(self.session), '## Stored report')
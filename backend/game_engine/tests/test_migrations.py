@@ -0,0 +1,62 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+
+class DataMigrationTests(TransactionTestCase):
+    """JSON -> table data migrations must keep the JSON as the source of truth."""
+
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate([('game_engine', target)])
+        return executor.loader.project_state([('game_engine', target)]).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes('game_engine'))
+
+    def make_session(self, apps, **fields):
+        user = apps.get_model('auth', 'User').objects.create(username='migrator')
+        return apps.get_model('game_engine', 'GameSession').objects.create(user=user, **fields)
+
+    def test_portfolio_rebuilt_from_json_over_stale_0019_rows(self):
+        apps = self.migrate('0019_auto_20260216_0025')
+        session = self.make_session(apps, portfolio={'tech': 25, 'gold': 5, 'real_estate': 0})
+        # Row copied by 0019 before later trades updated only the JSON
+        apps.get_model('game_engine', 'PortfolioItem').objects.create(
+            session_id=session.id, sector='tech', units=10.0
+        )
+
+        apps = self.migrate('0020_remove_gamesession_portfolio')
+        holdings = dict(
+            apps.get_model('game_engine', 'PortfolioItem').objects
+            .filter(session_id=session.id).values_list('sector', 'units')
+        )
+        self.assertEqual(holdings, {'tech': 25.0, 'gold': 5.0})
+
+    def test_purchase_history_fully_copied_over_stale_0019_rows(self):
+        apps = self.migrate('0023_gamesession_choice_count')
+        history = [
+            {'sector': 'tech', 'units': 10, 'price': 100, 'month': 1},
+            {'sector': 'gold', 'units': 2, 'price': 1800, 'month': 3},
+            {'sector': 'tech', 'units': 5, 'price': 120, 'month': 4},
+        ]
+        session = self.make_session(apps, purchase_history=history)
+        # Row copied by 0019 when the history held only the first buy
+        apps.get_model('game_engine', 'TransactionLedger').objects.create(
+            session_id=session.id, transaction_type='BUY', sector='tech',
+            units=10, price_per_unit=100, total_amount=1000, month=1,
+        )
+
+        apps = self.migrate('0024_remove_gamesession_purchase_history')
+        rows = list(
+            apps.get_model('game_engine', 'TransactionLedger').objects
+            .filter(session_id=session.id).order_by('month')
+            .values_list('transaction_type', 'sector', 'units', 'price_per_unit', 'month')
+        )
+        self.assertEqual(rows, [
+            ('BUY', 'tech', 10.0, 100.0, 1),
+            ('BUY', 'gold', 2.0, 1800.0, 3),
+            ('BUY', 'tech', 5.0, 120.0, 4),
+        ])
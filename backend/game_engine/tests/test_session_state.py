@@ -0,0 +1,106 @@
+from django.contrib.auth.models import User
+from django.core.exceptions import PermissionDenied
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from game_engine.models import (
+    Choice, GameHistory, GameSession, PlayerChoice, RecurringExpense, ScenarioCard,
+)
+from game_engine.services import GameEngine
+
+
+class SessionStateTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester')
+        self.session = GameSession.objects.create(
+            user=self.user, wealth=200000, current_month=6, current_level=2, credit_score=760,
+            market_prices={"tech": 100},
+        )
+
+    def reload(self):
+        return GameSession.objects.get(pk=self.session.pk)
+
+    def test_save_dirty_writes_only_changed_fields(self):
+        session = self.reload()
+        session.wealth += 500
+        session.market_prices['tech'] = 120  # in-place JSON edit
+        self.assertEqual(sorted(session.get_dirty_fields()), ['market_prices', 'wealth'])
+
+        with CaptureQueriesContext(connection) as queries:
+            session.save_dirty()
+        self.assertEqual(len(queries), 1)
+        sql = queries[0]['sql']
+        self.assertIn('"wealth"', sql)
+        self.assertIn('"market_prices"', sql)
+        self.assertNotIn('"happiness"', sql)
+        self.assertEqual(session.get_dirty_fields(), [])
+
+        with CaptureQueriesContext(connection) as queries:
+            session.save_dirty()
+        self.assertEqual(len(queries), 0)
+
+        stored = self.reload()
+        self.assertEqual((stored.wealth, stored.market_prices), (200500, {"tech": 120}))
+
+    def assert_counters_match_rows(self):
+        session = self.reload()
+        active = RecurringExpense.objects.filter(session=session, is_cancelled=False)
+        self.assertEqual(session.recurring_expenses, active.aggregate(t=Sum('amount'))['t'] or 0)
+        self.assertEqual(
+            session.total_debt_emi, active.filter(category='DEBT').aggregate(t=Sum('amount'))['t'] or 0
+        )
+        self.assertEqual(session.choice_count, PlayerChoice.objects.filter(session=session).count())
+
+    def test_cached_totals_follow_loans_payoff_choices_and_skips(self):
+        card = ScenarioCard.objects.create(title='Clear dues', description='d', category='NEEDS')
+        payoff = Choice.objects.create(
+            card=card, text='Repay the app loan', wealth_impact=-10000,
+            cancels_expense_name='High Interest Loan',
+        )
+
+        for loan_type in ('BANK', 'INSTANT_APP'):
+            self.assertNotIn('error', GameEngine.process_loan(self.session, loan_type))
+            self.assert_counters_match_rows()
+        self.assertEqual(self.reload().total_debt_emi, 1700)
+
+        GameEngine.process_choice(self.session, card, payoff)
+        self.assert_counters_match_rows()
+        self.assertEqual(self.reload().total_debt_emi, 1200)
+
+        GameEngine.process_skip(self.session.pk, card, self.user)
+        self.assert_counters_match_rows()
+        self.assertEqual(self.reload().choice_count, 2)
+
+    def test_double_submit_on_game_ending_turn_finalizes_once(self):
+        card = ScenarioCard.objects.create(title='Crash', description='d', category='NEEDS')
+        ruin = Choice.objects.create(card=card, text='All in', wealth_impact=-250000)
+
+        self.assertTrue(GameEngine.process_choice(self.session, card, ruin)['game_over'])
+        # The second request passed the view's is_active check before the first committed
+        with self.assertRaises(GameSession.DoesNotExist):
+            GameEngine.process_choice(self.session, card, ruin)
+        with self.assertRaises(GameSession.DoesNotExist):
+            GameEngine.process_skip(self.session.pk, card, self.user)
+
+        self.assertEqual(GameHistory.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(self.reload().choice_count, 1)
+
+    def test_scam_reply_after_game_over_is_refused(self):
+        stale = self.reload()
+        GameEngine._finalize_game(self.reload(), 'BANKRUPTCY')
+
+        result = GameEngine.process_scam_choice(stale, True, 50000)
+
+        self.assertIn('error', result)
+        self.assertEqual(self.reload().wealth, 200000)
+
+    def test_skip_checks_ownership_before_changing_anything(self):
+        card = ScenarioCard.objects.create(title='Bill', description='d', category='NEEDS')
+        stranger = User.objects.create_user(username='stranger')
+
+        with self.assertRaises(PermissionDenied):
+            GameEngine.process_skip(self.session.pk, card, stranger)
+        self.assertEqual(self.reload().choice_count, 0)
+        self.assertFalse(PlayerChoice.objects.exists())
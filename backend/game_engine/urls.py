@@ -16,6 +16,7 @@ urlpatterns = [
     path('use-lifeline/', views.use_lifeline, name='use-lifeline'),
     path('ai-advice/', views.get_ai_advice, name='ai-advice'),
     path('leaderboard/', views.get_leaderboard, name='leaderboard'),
+    path('final-report/<int:session_id>/', views.final_report, name='final-report'),
     
     # Stock Market
     path('buy-stock/', views.buy_stock, name='buy-stock'),
@@ -6,6 +6,7 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from django.contrib.auth.models import User
 from django.core.exceptions import PermissionDenied
+from django.http import StreamingHttpResponse
 
 from .models import (
     GameSession, ScenarioCard, Choice, PlayerChoice,
@@ -20,6 +21,12 @@ from .advisor import get_advisor
 from .services import GameEngine
 from .firebase_auth import FirebaseAuthentication
 
+# Columns the card, skip and lifeline paths never read or serialize.
+_CARD_PATH_DEFERRED = ('market_trends', 'final_report')
+# Relations GameSessionSerializer reads (username, persona); the card path's
+# AI prefetch uses the persona too.
+_CARD_PATH_RELATED = ('user', 'persona_profile')
+
 
 # ==================== AUTHENTICATION ====================
 
@@ -84,7 +91,7 @@ def get_card(request, session_id):
     Supports language parameter: ?lang=hi or ?lang=mr
     """
     try:
-        session = GameSession.objects.get(id=session_id, is_active=True)
+        session = GameSession.objects.select_related(*_CARD_PATH_RELATED).defer(*_CARD_PATH_DEFERRED).get(id=session_id, is_active=True)
     except GameSession.DoesNotExist:
         return Response(
             {'error': 'Session not found or inactive.'},
@@ -141,10 +148,9 @@ def submit_choice(request):
         )
 
     try:
-        # select_related avoids a second query when accessing choice.card
-        choice = Choice.objects.select_related(
-            'card', 'card__market_event'
-        ).get(id=choice_id, card_id=card_id)
+        # select_related avoids a second query when accessing choice.card;
+        # the card's market event comes from MarketEvent's cache
+        choice = Choice.objects.select_related('card').get(id=choice_id, card_id=card_id)
     except Choice.DoesNotExist:
         return Response(
             {'error': 'Invalid choice.'},
@@ -152,7 +158,14 @@ def submit_choice(request):
         )
 
     # DELEGATE TO ENGINE
-    result = GameEngine.process_choice(session, choice.card, choice)
+    try:
+        result = GameEngine.process_choice(session, choice.card, choice)
+    except GameSession.DoesNotExist:
+        # The game ended while this request waited for the session lock
+        return Response(
+            {'error': 'Session not found or inactive.'},
+            status=status.HTTP_404_NOT_FOUND
+        )
     
     response_data = {
         'feedback': result['feedback'],
@@ -195,7 +208,7 @@ def take_loan(request):
              return Response(result, status=status.HTTP_400_BAD_REQUEST)
              
         return Response({
-            'session': GameSessionSerializer(session).data,
+            'session': GameSessionSerializer(result['session']).data,
             'message': result['message']
         })
         
@@ -219,15 +232,13 @@ def skip_card(request):
         return Response({'error': 'Missing params.'}, status=status.HTTP_400_BAD_REQUEST)
 
     try:
-        session = GameSession.objects.get(id=session_id, is_active=True)
-        GameEngine.validate_ownership(request.user, session)
+        card = GameEngine.get_card(card_id)
         
-        card = ScenarioCard.objects.get(id=card_id)
-        
-        result = GameEngine.process_skip(session, card)
+        # process_skip loads, locks and ownership-checks the session itself
+        result = GameEngine.process_skip(session_id, card, request.user)
         
         return Response({
-            'session': GameSessionSerializer(session).data,
+            'session': GameSessionSerializer(result['session']).data,
             'message': result['message'],
             'skipped': True
         })
@@ -246,7 +257,7 @@ def get_session(request, session_id):
         session = GameSession.objects.select_related(
             'user', 'persona_profile'
         ).prefetch_related(
-            'expenses', 'income_sources'
+            'expenses', 'income_sources', 'portfolio_items'
         ).get(id=session_id)
     except GameSession.DoesNotExist:
         return Response(
@@ -278,7 +289,7 @@ def use_lifeline(request):
         )
 
     try:
-        session = GameSession.objects.get(id=session_id, is_active=True)
+        session = GameSession.objects.select_related(*_CARD_PATH_RELATED).defer(*_CARD_PATH_DEFERRED).get(id=session_id, is_active=True)
     except GameSession.DoesNotExist:
         return Response(
             {'error': 'Session not found or inactive.'},
@@ -292,7 +303,8 @@ def use_lifeline(request):
         )
 
     try:
-        card = ScenarioCard.objects.get(id=card_id)
+        # use_lifeline picks the hint from the cached choices
+        card = GameEngine.get_card(card_id)
     except ScenarioCard.DoesNotExist:
         return Response(
             {'error': 'Card not found.'},
@@ -339,7 +351,7 @@ def get_ai_advice(request):
         )
 
     try:
-        card = ScenarioCard.objects.prefetch_related('choices').get(id=card_id)
+        card = GameEngine.get_card(card_id)
     except ScenarioCard.DoesNotExist:
         return Response(
             {'error': 'Card not found.'},
@@ -382,14 +394,16 @@ def get_leaderboard(request):
     # Get completed sessions with highest scores
     top_sessions = GameSession.objects.filter(
         is_active=False
-    ).select_related('user').order_by('-financial_literacy', '-wealth')[:10]
+    ).select_related('user').prefetch_related(
+        'portfolio_items'
+    ).order_by('-financial_literacy', '-wealth')[:10]
 
     leaderboard = []
     for i, session in enumerate(top_sessions, 1):
         # Calculate Portfolio Value
         portfolio_val = 0
-        if session.portfolio and session.market_prices:
-             for sector, units in session.portfolio.items():
+        if session.market_prices:
+             for sector, units in session.get_holdings().items():
                  price = session.market_prices.get(sector, 0)
                  portfolio_val += (units * price)
         
@@ -441,7 +455,7 @@ def buy_stock(request):
              return Response(result, status=status.HTTP_400_BAD_REQUEST)
              
         return Response({
-            'session': GameSessionSerializer(session).data,
+            'session': GameSessionSerializer(result['session']).data,
             'message': result['message']
         })
 
@@ -474,7 +488,7 @@ def sell_stock(request):
              return Response(result, status=status.HTTP_400_BAD_REQUEST)
              
         return Response({
-            'session': GameSessionSerializer(session).data,
+            'session': GameSessionSerializer(result['session']).data,
             'message': result['message']
         })
 
@@ -488,6 +502,25 @@ def sell_stock(request):
 
 
 
+@api_view(['GET'])
+@authentication_classes([FirebaseAuthentication])
+@permission_classes([IsAuthenticated])
+def final_report(request, session_id):
+    """Stream the end-of-game report (Markdown), generating it on first request."""
+    try:
+        session = GameSession.objects.get(id=session_id, is_active=False)
+        GameEngine.validate_ownership(request.user, session)
+    except GameSession.DoesNotExist:
+        return Response({'error': 'Finished session not found.'}, status=status.HTTP_404_NOT_FOUND)
+    except PermissionDenied:
+        return Response({'error': 'Unauthorized.'}, status=status.HTTP_403_FORBIDDEN)
+
+    return StreamingHttpResponse(
+        GameEngine.stream_final_report(session),
+        content_type='text/markdown; charset=utf-8'
+    )
+
+
 @api_view(['GET'])
 @authentication_classes([FirebaseAuthentication])
 @permission_classes([IsAuthenticated])
@@ -504,9 +537,10 @@ def market_status(request, session_id):
     
     # Use canonical sector list from GameEngine config
     stock_sectors = GameEngine.CONFIG['STOCK_SECTORS']
+    owned = session.get_holdings()
     
     for sector in stock_sectors:
-        units = session.portfolio.get(sector, 0)
+        units = owned.get(sector, 0)
         price = session.market_prices.get(sector, 100)
         value = int(units * price)
         portfolio_value += value
@@ -548,7 +582,7 @@ def trade_futures(request):
              return Response(result, status=status.HTTP_400_BAD_REQUEST)
              
         return Response({
-            'session': GameSessionSerializer(session).data,
+            'session': GameSessionSerializer(result['session']).data,
             'message': result['message']
         })
         
@@ -602,7 +636,7 @@ def invest_mutual_fund(request):
              return Response(result, status=400)
              
         return Response({
-            'session': GameSessionSerializer(session).data,
+            'session': GameSessionSerializer(result['session']).data,
             'message': result['message']
         })
     except (ValueError, TypeError):
@@ -632,7 +666,7 @@ def redeem_mutual_fund(request):
              return Response(result, status=400)
              
         return Response({
-            'session': GameSessionSerializer(session).data,
+            'session': GameSessionSerializer(result['session']).data,
             'message': result['message']
         })
     except (ValueError, TypeError):
@@ -662,7 +696,7 @@ def apply_ipo(request):
              return Response(result, status=400)
              
         return Response({
-            'session': GameSessionSerializer(session).data,
+            'session': GameSessionSerializer(result['session']).data,
             'message': result['message']
         })
     except (ValueError, TypeError):
@@ -697,6 +731,8 @@ def respond_to_chatbot(request):
 
     if character == 'sundar':
         result = GameEngine.process_scam_choice(session, accepted, scam_loss_amount)
+        if 'error' in result:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
         return Response({
             'message': result['message'],
             'session': GameSessionSerializer(result['session']).data,